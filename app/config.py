@@ -7,14 +7,80 @@ load_dotenv()  # Load environment variables from a .env file (for local developm
 
 class Config:
     BOT_TOKEN = os.getenv("BOT_TOKEN")
+
+    # Where reservations are stored: "supabase", or "sqlite" for a local file
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+    SQLITE_PATH = os.getenv("SQLITE_PATH", "reservations.sqlite3")
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+    # Telegram user ids allowed to run staff commands such as /export
+    ADMIN_IDS = {int(user_id) for user_id in os.getenv("ADMIN_IDS", "").split(",") if user_id.strip()}
+
+    # Slot grid: first and last slot start times and slot length. Leave ROOMS
+    # empty for a single room (reservations without a room column).
+    SLOT_FIRST = os.getenv("SLOT_FIRST", "10:00")
+    SLOT_LAST = os.getenv("SLOT_LAST", "21:00")
+    SLOT_MINUTES = int(os.getenv("SLOT_MINUTES", "60"))
+    ROOMS = [room.strip() for room in os.getenv("ROOMS", "").split(",") if room.strip()]
+
+    # Updates from different users run in parallel, up to this many at once
+    CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "16"))
+
+    # Conversation state persistence (set PERSISTENCE_PATH to an empty string to disable)
+    PERSISTENCE_PATH = os.getenv("PERSISTENCE_PATH", "bot_state.sqlite3")
+    PERSISTENCE_FLUSH_INTERVAL = float(os.getenv("PERSISTENCE_FLUSH_INTERVAL", "5"))
+
+    # Per-operation deadlines (seconds); slow reads are hedged with a second request.
+    # After DB_BREAKER_FAILURES consecutive failures, Supabase calls fail fast for
+    # DB_BREAKER_RESET seconds and views are served from the last-known-good snapshot.
+    DB_READ_TIMEOUT = float(os.getenv("DB_READ_TIMEOUT", "3"))
+    DB_WRITE_TIMEOUT = float(os.getenv("DB_WRITE_TIMEOUT", "5"))
+    DB_HEDGE_AFTER = float(os.getenv("DB_HEDGE_AFTER", "0.5"))  # 0 disables hedging
+    DB_BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES", "5"))
+    DB_BREAKER_RESET = float(os.getenv("DB_BREAKER_RESET", "30"))
+
+    # How long the slot lists fetched by /select_date are reused for the chosen date.
+    # Holding a slot re-checks it, so an outdated list only leads to "already booked".
+    WEEK_SLOTS_MAX_AGE = float(os.getenv("WEEK_SLOTS_MAX_AGE", "60"))
+
+    # Query the coming week once at startup so the first user hits warm connections
+    PREWARM = os.getenv("PREWARM", "true").lower() in ("1", "true", "yes")
+
+    # HTTP connection pools for the Supabase and Telegram clients (per client)
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+    HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+    HTTP2 = os.getenv("HTTP2", "true").lower() in ("1", "true", "yes")
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+    HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))  # Wait for a free connection
+
+    # Answer availability from an in-memory mirror kept current over Supabase Realtime
+    MIRROR_ENABLED = os.getenv("MIRROR_ENABLED", "").lower() in ("1", "true", "yes")
+
+    # Prometheus-style metrics endpoint (disabled unless METRICS_PORT is set)
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+    # Webhook mode (the bot uses long polling unless WEBHOOK_ENABLED is set)
+    WEBHOOK_ENABLED = os.getenv("WEBHOOK_ENABLED", "").lower() in ("1", "true", "yes")
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # Public base URL; leave unset to skip setWebhook
+    WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+    WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN")
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
 
-# Validate critical configurations
-if not Config.BOT_TOKEN:
-    raise ValueError("BOT_TOKEN must be set in the environment variables.")
-if not Config.SUPABASE_URL:
-    raise ValueError("SUPABASE_URL must be set in the environment variables.")
-if not Config.SUPABASE_KEY:
-    raise ValueError("SUPABASE_KEY must be set in the environment variables.")
+def validate_config(bot=True):
+    """Validate critical configurations; pass ``bot=False`` for tools that never talk to Telegram."""
+    if bot and not Config.BOT_TOKEN:
+        raise ValueError("BOT_TOKEN must be set in the environment variables.")
+    if Config.STORAGE_BACKEND not in ("supabase", "sqlite"):
+        raise ValueError("STORAGE_BACKEND must be either 'supabase' or 'sqlite'.")
+    if Config.STORAGE_BACKEND == "supabase" and not Config.SUPABASE_URL:
+        raise ValueError("SUPABASE_URL must be set in the environment variables.")
+    if Config.STORAGE_BACKEND == "supabase" and not Config.SUPABASE_KEY:
+        raise ValueError("SUPABASE_KEY must be set in the environment variables.")
+    if bot and Config.WEBHOOK_ENABLED and not Config.WEBHOOK_SECRET_TOKEN:
+        raise ValueError("WEBHOOK_SECRET_TOKEN must be set when WEBHOOK_ENABLED is on.")
@@ -1,117 +1,426 @@
-import os
-from datetime import datetime
+import time
+import uuid
+from datetime import date as Date, datetime, timedelta
 
 import pytz
-from supabase import Client, create_client
+from app.cache import TTLCache
+from app.config import Config
+from app.resilience import StaleResult, is_backend_failure
+from app.slots import AvailabilityIndex, SlotGrid
+from app.storage import create_store
+
+DRAFT_TTL_SECONDS = 10 * 60  # How long a booking draft holds its slot
+HISTORY_PAGE_SIZE = 10  # Reservations per page of /view_my_all_reservations
+RESERVATION_CACHE_TTL_SECONDS = 60  # How long a user's current reservations stay cached
+RESERVATION_CACHE_SIZE = 1024  # Users kept in the reservation cache
+EXPORT_PAGE_SIZE = 500  # Rows fetched per request when exporting reservations
+SNAPSHOT_TTL_SECONDS = 24 * 60 * 60  # How old a fallback view may be while Supabase is down
+
+
+def dates_between(first_date, last_date):
+    day, last = Date.fromisoformat(first_date), Date.fromisoformat(last_date)
+    while day <= last:
+        yield day.isoformat()
+        day += timedelta(days=1)
 
 
 class Database:
-    def __init__(self):
-        self.url = os.getenv("SUPABASE_URL")
-        self.key = os.getenv("SUPABASE_KEY")
-        self.client: Client = create_client(self.url, self.key)
+    def __init__(self, store=None):
+        self.store = store or create_store()  # ReservationStore chosen by Config.STORAGE_BACKEND
         self.timezone = pytz.timezone("Europe/Kyiv")
+        self.listeners = []
+        self.drafts = {}  # draft_id -> pending reservation fields
+        self.held_slots = {}  # (date, slot key) -> draft_id
+        self.grid = SlotGrid(
+            Config.SLOT_FIRST, Config.SLOT_LAST, Config.SLOT_MINUTES, Config.ROOMS
+        )
+        self.with_room = self.grid.rooms != [None]  # Rows carry a room column
+        self.mirror = None  # Optional ReservationMirror answering availability from memory
+        self.reservation_cache = TTLCache(
+            maxsize=RESERVATION_CACHE_SIZE, ttl=RESERVATION_CACHE_TTL_SECONDS
+        )
+        # Last-known-good results, served while the store is unavailable
+        self.reserved_snapshot = {}  # date -> (reserved rows, fetched at)
+        self.view_snapshot = TTLCache(maxsize=RESERVATION_CACHE_SIZE, ttl=SNAPSHOT_TTL_SECONDS)
+
+    def add_listener(self, listener):
+        """Registers an object notified through reservation_added/reservation_removed."""
+        self.listeners.append(listener)
+
+    def notify_added(self, row):
+        if self.mirror:
+            self.mirror.apply_local_insert(row)
+        self.reservation_cache.invalidate(row["user_id"])
+        for listener in self.listeners:
+            listener.reservation_added(row["date"], row["slot"], row["user_id"])
+
+    def notify_removed(self, rows):
+        for row in rows:
+            if self.mirror:
+                self.mirror.apply_local_delete(row)
+            self.reservation_cache.invalidate(row["user_id"])
+            for listener in self.listeners:
+                listener.reservation_removed(row["date"], row["slot"], row["user_id"])
+
+    async def close(self):
+        """Close the store's connections."""
+        await self.store.close()
 
     def get_current_time(self):
         """Returns the current time localized to Ukrainian time."""
         return datetime.now(self.timezone).strftime("%Y-%m-%d %H:%M:%S")
 
     # Reservation logic
-    def get_available_slots(self, date, start_hour=10, end_hour=21):
+    def get_bookable_mask(self, date):
+        """Returns the grid mask of slots that can still be booked on a date."""
         current_time = datetime.now(self.timezone)
-        current_hour = current_time.hour
+        today = current_time.strftime("%Y-%m-%d")
+        if date < today:
+            return 0
+        if date == today:
+            return self.grid.mask_after(current_time.hour * 60 + current_time.minute)
+        return self.grid.full_mask
 
-        # Fetch reserved slots
-        reserved_slots = (
-            self.client.table("reservations").select("slot").eq("date", date).execute()
+    def is_bookable(self, date, key):
+        """True if a slot key is on the grid, in a known room and not in the past."""
+        label, room = self.grid.parse_key(key)
+        return room in self.grid.rooms and bool(self.grid.bit(label) & self.get_bookable_mask(date))
+
+    async def get_reserved_rows(self, first_date, last_date):
+        """Returns id, date, slot (and room) of every reservation in a date range."""
+        return await self.store.get_reserved_rows(
+            first_date, last_date, with_room=self.with_room
         )
-        reserved_slots = {row["slot"] for row in reserved_slots.data}
 
-        # Determine available slots
-        if date == current_time.strftime("%Y-%m-%d"):  # If today
-            all_slots = {
-                f"{hour}:00"
-                for hour in range(max(start_hour, current_hour + 1), end_hour + 1)
-            }
-        else:  # Future dates
-            all_slots = {f"{hour}:00" for hour in range(start_hour, end_hour + 1)}
+    def save_reserved_snapshot(self, first_date, last_date, rows):
+        fetched_at = time.time()
+        today = datetime.now(self.timezone).strftime("%Y-%m-%d")
+        for date in [date for date in self.reserved_snapshot if date < today]:
+            del self.reserved_snapshot[date]
+        for date in dates_between(first_date, last_date):
+            self.reserved_snapshot[date] = ([row for row in rows if row["date"] == date], fetched_at)
 
-        # Return available slots
-        return sorted(all_slots - reserved_slots)
+    def load_reserved_snapshot(self, first_date, last_date):
+        """Returns (rows, oldest fetch time) for a date range, or None if a date is missing."""
+        rows, fetched_at = [], time.time()
+        for date in dates_between(first_date, last_date):
+            if date not in self.reserved_snapshot:
+                return None
+            date_rows, date_fetched_at = self.reserved_snapshot[date]
+            rows.extend(date_rows)
+            fetched_at = min(fetched_at, date_fetched_at)
+        return rows, fetched_at
 
-    def reserve_slot(self, date, slot, user_id, username):
-        created_at = self.get_current_time()
+    async def get_availability_index(self, first_date, last_date):
+        """Builds the reserved-slot bitmaps for a date range, from the mirror when it covers it.
+
+        If Supabase is unavailable the index is built from the last rows
+        fetched for those dates and ``stale_since`` is set on it.
+        """
+        if self.mirror and self.mirror.covers(first_date, last_date):
+            return self.mirror.index
         try:
-            response = (
-                self.client.table("reservations")
-                .insert(
-                    {
-                        "date": date,
-                        "slot": slot,
-                        "user_id": user_id,
-                        "username": username,
-                        "created_at": created_at,
-                    }
-                )
-                .execute()
-            )
-            return response.data[0]["id"]
+            rows = await self.get_reserved_rows(first_date, last_date)
         except Exception as e:
+            snapshot = self.load_reserved_snapshot(first_date, last_date)
+            if snapshot is None or not is_backend_failure(e):
+                raise
+            rows, fetched_at = snapshot
+            index = AvailabilityIndex.from_rows(self.grid, rows)
+            index.stale_since = fetched_at
+            return index
+
+        self.save_reserved_snapshot(first_date, last_date, rows)
+        return AvailabilityIndex.from_rows(self.grid, rows)
+
+    def list_free_slots(self, index, date):
+        slots = index.free_keys(date, self.get_bookable_mask(date), self.get_held_masks(date))
+        return StaleResult(slots, index.stale_since) if index.stale_since else slots
+
+    async def get_available_slots(self, date):
+        """Returns free slot keys ("10:00", or "10:00 Room" with several rooms)."""
+        index = await self.get_availability_index(date, date)
+        return self.list_free_slots(index, date)
+
+    async def get_available_slots_for_dates(self, dates):
+        """Returns {date: available slots} for consecutive dates using one range query."""
+        index = await self.get_availability_index(dates[0], dates[-1])
+        return {date: self.list_free_slots(index, date) for date in dates}
+
+    async def get_free_windows(self, date, duration_minutes):
+        """Returns {room: start times} where ``duration_minutes`` of consecutive slots are free."""
+        length = -(-duration_minutes // self.grid.slot_minutes)
+        index = await self.get_availability_index(date, date)
+        free = index.free_masks(date, self.get_bookable_mask(date), self.get_held_masks(date))
+        return {room: self.grid.labels_in(self.grid.windows(mask, length)) for room, mask in free.items()}
+
+    # Booking drafts
+    def get_held_masks(self, date):
+        """Returns {room: mask} of slots on a date held by an unexpired draft."""
+        self.release_expired_drafts()
+        held = {}
+        for held_date, key in self.held_slots:
+            if held_date == date:
+                label, room = self.grid.parse_key(key)
+                held[room] = held.get(room, 0) | self.grid.bit(label)
+        return held
+
+    def release_draft(self, draft_id):
+        draft = self.drafts.pop(draft_id, None)
+        if draft:
+            self.held_slots.pop((draft["date"], draft["key"]), None)
+        return draft
+
+    def has_draft(self, user_id):
+        """True if the user is in the middle of booking, i.e. holds an unexpired draft."""
+        self.release_expired_drafts()
+        return any(draft["user_id"] == user_id for draft in self.drafts.values())
+
+    def release_expired_drafts(self):
+        now = time.monotonic()
+        expired = [
+            draft_id for draft_id, draft in self.drafts.items() if draft["expires_at"] <= now
+        ]
+        for draft_id in expired:
+            self.release_draft(draft_id)
+
+    async def hold_slot(self, date, key, user_id, username, ttl=DRAFT_TTL_SECONDS, draft_id=None):
+        """Holds a slot key for the user without writing it; returns a draft id or None if taken.
+
+        Picking a slot the user already holds returns the same draft and
+        extends the hold to a full ``DRAFT_TTL_SECONDS``. Keys off the grid or
+        already in the past are refused like taken ones.
+        """
+        if not self.is_bookable(date, key):
             return None
+        self.release_expired_drafts()
+        held_by = self.held_slots.get((date, key))
+        if held_by:
+            draft = self.drafts[held_by]
+            if draft["user_id"] != user_id:
+                return None
+            draft["expires_at"] = max(draft["expires_at"], time.monotonic() + DRAFT_TTL_SECONDS)
+            return held_by
 
-    # User details logic
-    def update_user_details(self, reservation_id, name, surname, phone):
-        try:
-            self.client.table("reservations").update(
-                {"name": name, "surname": surname, "phone": phone}
-            ).eq("id", reservation_id).execute()
-            return True
-        except Exception as e:
+        slot, room = self.grid.parse_key(key)
+        if await self.store.is_slot_taken(date, slot, room) or (date, key) in self.held_slots:
+            return None
+
+        # A user works on one booking at a time
+        for other_id, draft in list(self.drafts.items()):
+            if draft["user_id"] == user_id:
+                self.release_draft(other_id)
+
+        draft_id = draft_id or uuid.uuid4().hex
+        self.drafts[draft_id] = {
+            "date": date,
+            "slot": slot,
+            "user_id": user_id,
+            "username": username,
+            "key": key,
+            "expires_at": time.monotonic() + ttl,
+        }
+        if room is not None:
+            self.drafts[draft_id]["room"] = room
+        self.held_slots[(date, key)] = draft_id
+        return draft_id
+
+    def draft_state(self, draft_id):
+        """Returns a JSON-serializable copy of a draft, for restore_draft after a restart."""
+        draft = self.drafts.get(draft_id)
+        if not draft:
+            return None
+        state = {field: value for field, value in draft.items() if field != "expires_at"}
+        state["expires"] = time.time() + draft["expires_at"] - time.monotonic()
+        return state
+
+    async def restore_draft(self, draft_id, state):
+        """Holds a draft again from its draft_state; returns the draft id or None.
+
+        Drafts live in this process only, so after a restart the hold is
+        taken again if it has not expired and the slot is still free.
+        """
+        self.release_expired_drafts()
+        if draft_id in self.drafts:
+            return draft_id
+        ttl = state["expires"] - time.time()
+        if ttl <= 0:
+            return None
+
+        restored = await self.hold_slot(
+            state["date"], state["key"], state["user_id"], state["username"], ttl, draft_id
+        )
+        if restored != draft_id:
             return None
+        for field in ("name", "surname", "phone"):
+            if field in state:
+                self.drafts[draft_id][field] = state[field]
+        return draft_id
+
+    def update_draft_details(self, draft_id, name, surname, phone):
+        self.release_expired_drafts()
+        draft = self.drafts.get(draft_id)
+        if not draft:
+            return None
+        draft.update({"name": name, "surname": surname, "phone": phone})
+        return True
+
+    async def commit_draft(self, draft_id, status, payment_id, payment_method):
+        """Writes the complete reservation in a single insert; returns its id or None.
 
-    # Payment logic
-    def update_payment_status(self, reservation_id, status, payment_id, payment_method):
-        """Update the payment status of a reservation."""
-        self.client.table("reservations").update(
+        The draft keeps its hold until the insert has settled. If the store is
+        unavailable the error propagates with the draft intact, so the user
+        can retry; a retry after a write that timed out but landed finds the
+        user's own row and returns its id.
+        """
+        self.release_expired_drafts()
+        draft = self.drafts.get(draft_id)
+        if not draft:
+            return None
+
+        reservation = {
+            field: value for field, value in draft.items() if field not in ("key", "expires_at")
+        }
+        reservation.update(
             {
                 "payment_status": status,
                 "payment_method": payment_method,
                 "payment_id": payment_id,
+                "created_at": self.get_current_time(),
             }
-        ).eq("id", reservation_id).execute()
+        )
+        try:
+            reservation_id = await self.store.insert_reservation(reservation)
+        except Exception as e:
+            if is_backend_failure(e):
+                raise
+            # Refused, normally because the slot is booked - possibly by an
+            # earlier attempt of this draft whose response was lost
+            reservation_id = await self.find_own_reservation(draft)
+            if reservation_id is None:
+                self.release_draft(draft_id)
+                return None
+
+        self.release_draft(draft_id)
+        self.notify_added({**reservation, "id": reservation_id})
+        return reservation_id
+
+    async def find_own_reservation(self, draft):
+        """Returns the id of the user's reservation for a draft's slot, if it exists."""
+        rows = await self.store.get_user_reservations(
+            draft["user_id"], draft["date"], self.with_room
+        )
+        for row in rows:
+            if (row["date"], row["slot"], row.get("room")) == (
+                draft["date"],
+                draft["slot"],
+                draft.get("room"),
+            ):
+                return row["id"]
+        return None
 
     # Fetch user reservations
-    def get_user_current_reservations(self, user_id):
+    async def get_user_current_reservations(self, user_id):
+        """Returns the user's reservations from today on, served from a per-user cache.
+
+        While Supabase is unavailable the last result fetched is returned as a
+        StaleResult.
+        """
+        cached = self.reservation_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        epoch = self.reservation_cache.epoch
         current_time = self.get_current_time()
-        response = (
-            self.client.table("reservations")
-            .select("slot, date, created_at")
-            .filter("user_id", "eq", user_id)
-            .filter("date", "gte", current_time.split(" ")[0])
-            .order("date")
-            .execute()
-        )
-        return response.data
-
-    def get_all_user_reservations(self, user_id):
-        response = (
-            self.client.table("reservations")
-            .select("slot, date, created_at")
-            .filter("user_id", "eq", user_id)
-            .order("date")
-            .execute()
+        try:
+            rows = await self.store.get_user_reservations(
+                user_id, current_time.split(" ")[0], self.with_room
+            )
+        except Exception as e:
+            snapshot = self.view_snapshot.get(("current", user_id))
+            if snapshot is None or not is_backend_failure(e):
+                raise
+            rows, fetched_at = snapshot
+            return StaleResult(rows, fetched_at)
+
+        self.reservation_cache.set(user_id, rows, epoch=epoch)
+        self.view_snapshot.set(("current", user_id), (rows, time.time()))
+        return rows
+
+    async def get_user_reservations_page(
+        self, user_id, after=None, before=None, page_size=HISTORY_PAGE_SIZE
+    ):
+        """Returns (rows, has_previous, has_next) for one page of a user's history.
+
+        Pages are keyset-paginated on (date, slot, room): pass the (date, slot
+        key) of the last row shown as ``after`` for the next page, or of the
+        first row shown as ``before`` for the previous one. While Supabase is
+        unavailable a page seen before is returned with its rows as a
+        StaleResult.
+        """
+        key = ("page", user_id, after, before, page_size)
+        try:
+            page = await self._fetch_reservations_page(user_id, after, before, page_size)
+        except Exception as e:
+            snapshot = self.view_snapshot.get(key)
+            if snapshot is None or not is_backend_failure(e):
+                raise
+            (rows, has_previous, has_next), fetched_at = snapshot
+            return StaleResult(rows, fetched_at), has_previous, has_next
+
+        self.view_snapshot.set(key, (page, time.time()))
+        return page
+
+    async def _fetch_reservations_page(self, user_id, after, before, page_size):
+        # One extra row tells whether there is another page in this direction
+        data = await self.store.get_user_reservations_page(
+            user_id,
+            self.keyset_cursor(after),
+            self.keyset_cursor(before),
+            page_size + 1,
+            self.with_room,
         )
-        return response.data
+        rows = data[:page_size]
+        more = len(data) > page_size
+
+        if before:
+            return rows[::-1], more, True
+        return rows, after is not None, more
+
+    def keyset_cursor(self, cursor):
+        """(date, slot key) -> the store's (date, slot) or (date, slot, room) cursor."""
+        if not cursor:
+            return None
+        date, key = cursor
+        label, room = self.grid.parse_key(key)
+        return (date, label, room) if self.with_room else (date, label)
+
+    async def get_upcoming_reservations(self):
+        """Returns date, slot and user_id of every reservation from today on."""
+        current_time = self.get_current_time()
+        return await self.store.get_upcoming_reservations(current_time.split(" ")[0])
+
+    async def iter_reservations(self, first_date, last_date, page_size=EXPORT_PAGE_SIZE):
+        """Yields pages of full reservation rows in a date range, keyset-paged on (date, id)."""
+        cursor = None
+        while True:
+            rows = await self.store.get_reservations_page(first_date, last_date, cursor, page_size)
+            if not rows:
+                return
+
+            yield rows
+            if len(rows) < page_size:
+                return
+            cursor = rows[-1]["date"], rows[-1]["id"]
 
     # Cancel reservation logic
-    def cancel_slot(self, user_id, date, slot):
-        response = (
-            self.client.table("reservations")
-            .delete()
-            .match({"user_id": user_id, "date": date, "slot": slot})
-            .execute()
-        )
-        return response.data
+    async def cancel_slot(self, user_id, date, key):
+        """Cancels one of the user's reservations by date and slot key ("10:00" or "10:00 Room")."""
+        label, room = self.grid.parse_key(key)
+        rows = await self.store.delete_reservations(user_id, date, label, room)
+        self.notify_removed(rows)
+        return rows
 
-    def cancel_reservations(self, user_id):
-        self.client.table("reservations").delete().eq("user_id", user_id).execute()
+    async def cancel_reservations(self, user_id):
+        rows = await self.store.delete_reservations(user_id)
+        self.notify_removed(rows)
@@ -0,0 +1,99 @@
+"""Stream reservations for a date range as CSV.
+
+Used by the /export staff command and runnable from the command line:
+
+    python -m app.export 2025-01-01 2025-01-31 -o january.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+from datetime import datetime
+
+EXPORT_COLUMNS = (
+    "id",
+    "date",
+    "slot",
+    "room",
+    "name",
+    "surname",
+    "phone",
+    "username",
+    "user_id",
+    "payment_method",
+    "payment_status",
+    "payment_id",
+    "created_at",
+)
+
+# Cells starting with these are run as formulas by Excel and Google Sheets
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+USER_COLUMNS = ("name", "surname", "phone", "username")
+
+
+def neutralize_formulas(row):
+    """Prefix user-entered text that a spreadsheet would treat as a formula with '."""
+    for column in USER_COLUMNS:
+        value = row.get(column)
+        if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+            row = {**row, column: "'" + value}
+    return row
+
+
+def parse_date_range(args, today):
+    """Parse ``[first [last]]`` dates; defaults to today only."""
+    first = args[0] if args else today
+    last = args[1] if len(args) > 1 else first
+    for value in (first, last):
+        datetime.strptime(value, "%Y-%m-%d")  # Raises ValueError on bad input
+    if first > last:
+        raise ValueError("first date is after last date")
+    return first, last
+
+
+async def write_reservations_csv(db, first_date, last_date, stream):
+    """Write the range to a text stream page by page; returns the number of rows."""
+    writer = csv.DictWriter(stream, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    async for rows in db.iter_reservations(first_date, last_date):
+        writer.writerows(neutralize_formulas(row) for row in rows)
+        count += len(rows)
+    return count
+
+
+async def export_to_file(first_date, last_date, path):
+    from app.config import validate_config
+    from app.database import Database
+
+    validate_config(bot=False)  # Only storage settings are needed; BOT_TOKEN is not
+    db = Database()
+    try:
+        if path == "-":
+            return await write_reservations_csv(db, first_date, last_date, sys.stdout)
+        with open(path, "w", newline="", encoding="utf-8") as stream:
+            return await write_reservations_csv(db, first_date, last_date, stream)
+    finally:
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export reservations as CSV.")
+    parser.add_argument("first_date", help="YYYY-MM-DD")
+    parser.add_argument("last_date", nargs="?", help="YYYY-MM-DD (defaults to first_date)")
+    parser.add_argument("-o", "--output", default="-", help="file to write, '-' for stdout")
+    args = parser.parse_args()
+
+    dates = [args.first_date] + ([args.last_date] if args.last_date else [])
+    try:
+        first_date, last_date = parse_date_range(dates, args.first_date)
+    except ValueError as e:
+        parser.error(str(e))
+
+    count = asyncio.run(export_to_file(first_date, last_date, args.output))
+    print(f"Exported {count} reservations", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,113 @@
+import functools
+import io
 import logging
-from datetime import datetime, time, timedelta
+import tempfile
+from datetime import date as Date, datetime, timedelta
 
 from telegram import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
 from app.config import Config
+from app.database import DRAFT_TTL_SECONDS
+from app.export import parse_date_range, write_reservations_csv
+from app.rendering import KeyboardCache, render_reservations
+from app.resilience import is_backend_failure, is_stale
+from app.slots import SlotGrid
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-WORKING_HOURS_END = time(21, 0)  # Working hours end at 09:00 PM
 DAYS_IN_WEEK = 7  # Number of days to show in the calendar
+EXPORT_DOCUMENT_MAX_BYTES = 50 * 1024 * 1024  # Telegram's upload limit for bots
+BACKEND_UNAVAILABLE_TEXT = (
+    "Сервіс бронювань тимчасово недоступний 😔 Спробуйте ще раз за хвилину 🙏"
+)
 
-def get_next_valid_date(start_date: datetime) -> datetime:
-    """Get the next valid date considering working hours."""
-    if start_date.time() > WORKING_HOURS_END:
-        start_date += timedelta(days=1)
-    return start_date
 
+def week_dates(db) -> list[str]:
+    """The dates offered by /select_date, formatted once per day.
 
-def generate_dates(start_date: datetime, days: int) -> list[datetime]:
-    """Generate dates within working hours for the next 'days' days."""
-    dates = []
-    current_date = get_next_valid_date(start_date)
+    The week starts today in the venue's timezone, or tomorrow once the
+    day's last slot has started.
+    """
+    today = datetime.now(db.timezone).date()
+    return list(_week_dates(today, not db.get_bookable_mask(today.isoformat())))
+
+
+@functools.lru_cache(maxsize=2)
+def _week_dates(today: Date, after_hours: bool) -> tuple[str, ...]:
+    first = today + timedelta(days=1) if after_hours else today
+    return tuple(
+        (first + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(DAYS_IN_WEEK)
+    )
+
+
+async def reply_messages(message, texts: list[str], **kwargs) -> None:
+    """Replies with each text in turn; keyword arguments go with the last one."""
+    for text in texts[:-1]:
+        await message.reply_text(text, parse_mode="Markdown")
+    await message.reply_text(texts[-1], parse_mode="Markdown", **kwargs)
+
+
+def payment_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton("Оплатити онлайн 💳", callback_data="payment:online"),
+                InlineKeyboardButton("Оплатити в кафе ☕", callback_data="payment:cafe"),
+            ]
+        ]
+    )
+
+
+def stale_note(*results) -> str:
+    """Warning appended to replies built from the fallback snapshot."""
+    if any(is_stale(result) for result in results):
+        return "\n\n⚠️ Сервіс бронювань тимчасово недоступний — дані можуть бути застарілими."
+    return ""
+
+
+def history_keyboard(
+    reservations: list[dict], has_previous: bool, has_next: bool
+) -> InlineKeyboardMarkup | None:
+    """Build previous/next buttons carrying the (date, slot key) keyset cursor."""
+    buttons = []
+    if has_previous:
+        first = reservations[0]
+        key = SlotGrid.slot_key(first["slot"], first.get("room"))
+        buttons.append(
+            InlineKeyboardButton("⬅️ Попередні", callback_data=f"history:prev:{first['date']}:{key}")
+        )
+    if has_next:
+        last = reservations[-1]
+        key = SlotGrid.slot_key(last["slot"], last.get("room"))
+        buttons.append(
+            InlineKeyboardButton("Наступні ➡️", callback_data=f"history:next:{last['date']}:{key}")
+        )
+    return InlineKeyboardMarkup([buttons]) if buttons else None
 
-    for _ in range(days):
-        dates.append(current_date)
-        current_date += timedelta(days=1)
-    return dates
 
 class Handlers:
-    def __init__(self, db):
+    def __init__(self, db, waitlist=None):
         self.db = db
+        self.waitlist = waitlist
+        self.keyboards = KeyboardCache()
+
+    async def handle_error(self, update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Tells the user when a handler failed because the store is unavailable.
+
+        Handlers let backend failures propagate, so the repeated-tap guard
+        forgets the tap and pressing the same button again retries it.
+        """
+        error = context.error
+        if not is_backend_failure(error):
+            logger.error("Exception while handling an update", exc_info=error)
+            return
+
+        logger.warning("Update failed, the reservation store is unavailable: %s", error)
+        message = update.effective_message if isinstance(update, Update) else None
+        if message:
+            await message.reply_text(BACKEND_UNAVAILABLE_TEXT)
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text(
@@ -40,23 +116,31 @@ class Handlers:
 
     # Date selection logic
     async def select_date(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        now = datetime.now()
+        dates = week_dates(self.db)
+
+        # One range query for the whole week; fully booked days are hidden
+        # unless users can join the waitlist for them. Days with nothing left
+        # to book at all have no waitlist either.
+        week_slots = await self.db.get_available_slots_for_dates(dates)
+        week_slots = {
+            date: slots
+            for date, slots in week_slots.items()
+            if slots or (self.waitlist and self.db.get_bookable_mask(date))
+        }
+        if not week_slots:
+            await update.message.reply_text(
+                "На жаль, найближчим часом немає вільних місць 😥 Спробуйте пізніше 🙏"
+            )
+            return
 
-        available_dates = generate_dates(now, DAYS_IN_WEEK)
+        context.user_data["week_slots"] = week_slots
+        context.user_data["week_slots_at"] = datetime.now().timestamp()
 
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    date.strftime("%Y-%m-%d"), callback_data=date.strftime("%Y-%m-%d")
-                )
-            ]
-            for date in available_dates
-        ]
-
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = self.keyboards.date_picker(week_slots, bool(self.waitlist))
 
         await update.message.reply_text(
-            "Оберіть дату бронювання 📆", reply_markup=reply_markup
+            "Оберіть дату бронювання 📆" + stale_note(*week_slots.values()),
+            reply_markup=reply_markup,
         )
 
     async def handle_date_selection(
@@ -74,12 +158,25 @@ class Handlers:
             text=f"Дата обрана: {date} 📅\nШукаємо доступні слоти... ⏳"
         )
 
+        # Reuse the slots fetched by select_date if the date was picked right away;
+        # an old date message (or state restored after a restart) queries again
+        available_slots = None
+        fetched_at = context.user_data.get("week_slots_at", 0)
+        if datetime.now().timestamp() - fetched_at <= Config.WEEK_SLOTS_MAX_AGE:
+            available_slots = context.user_data.get("week_slots", {}).get(date)
+
         # Call the reserve handler and pass the query as an argument
-        await self.reserve(update, context, query=query)
+        await self.reserve(
+            update, context, query=query, available_slots=available_slots
+        )
 
     # Slot selection logic
     async def reserve(
-        self, update: Update, context: ContextTypes.DEFAULT_TYPE, query=None
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+        query=None,
+        available_slots=None,
     ) -> None:
         date = context.user_data.get("selected_date")
         if not date:
@@ -93,57 +190,87 @@ class Handlers:
                 )
             return
 
-        available_slots = self.db.get_available_slots(date)
+        if available_slots is None:
+            available_slots = await self.db.get_available_slots(date)
         if not available_slots:
-            if query:
-                await query.message.reply_text(
-                    f"На жаль, на {date} немає вільних місць 😥 Можливо, спробуйте іншу дату?😉️"
+            # Offer the booked slots for the waitlist instead of sending users back to polling
+            waitlist_slots = (
+                self.db.grid.labels_in(self.db.get_bookable_mask(date)) if self.waitlist else []
+            )
+            if waitlist_slots:
+                text = (
+                    f"На жаль, на {date} немає вільних місць 😥 Оберіть час, щоб стати в чергу — "
+                    "ми напишемо, щойно він звільниться 🔔"
                 )
+                reply_markup = self.keyboards.waitlist_picker(date, waitlist_slots)
             else:
-                await update.message.reply_text(
-                    f"На жаль, на {date} немає вільних місць 😥 Можливо, спробуйте іншу дату?😉️"
-                )
+                text = f"На жаль, на {date} немає вільних місць 😥 Можливо, спробуйте іншу дату?😉️"
+                reply_markup = None
+            if query:
+                await query.message.reply_text(text, reply_markup=reply_markup)
+            else:
+                await update.message.reply_text(text, reply_markup=reply_markup)
             return
 
-        keyboard = [
-            [InlineKeyboardButton(slot, callback_data=f"{date} {slot}")]
-            for slot in available_slots
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = self.keyboards.slot_picker(date, available_slots)
         if query:
             await query.message.reply_text(
-                f"Вільні місця на {date} ✔", reply_markup=reply_markup
+                f"Вільні місця на {date} ✔" + stale_note(available_slots),
+                reply_markup=reply_markup,
             )
         else:
             await update.message.reply_text(
-                f"Вільні місця на {date} ✔", reply_markup=reply_markup
+                f"Вільні місця на {date} ✔" + stale_note(available_slots),
+                reply_markup=reply_markup,
             )
 
     async def handle_slot_selection(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
-    ) -> None:
+    ) -> str:
+        """Hold the tapped slot; returns the outcome shown, for repeated taps."""
         query = update.callback_query
         await query.answer()
 
-        date, slot = query.data.split()
+        date, slot = query.data.split(" ", 1)  # slot carries the room when there are several
         user_id = query.from_user.id
         username = query.from_user.username or query.from_user.first_name
 
-        reservation_id = self.db.reserve_slot(date, slot, user_id, username)
+        # The slot is only held in memory; the reservation is written once payment is chosen.
+        # If the store can't be asked whether it is taken, handle_error tells the user.
+        draft_id = await self.db.hold_slot(date, slot, user_id, username)
 
-        if reservation_id:
-            await query.edit_message_text(
-                text=f"Бронювання підтверджено на {date} о {slot}! ✅🎉"
-            )
-            context.user_data["reservation_id"] = reservation_id
+        if draft_id:
+            outcome = f"Слот {slot} {date} закріплено за вами на {DRAFT_TTL_SECONDS // 60} хвилин ⏳"
+            await query.edit_message_text(text=outcome)
+            context.user_data["draft_id"] = draft_id
+            context.user_data["draft"] = self.db.draft_state(draft_id)
             context.user_data["slot_selected"] = True
+            week_slots = context.user_data.get("week_slots", {})
+            if slot in week_slots.get(date, []):
+                week_slots[date].remove(slot)
 
             # Ask for user details
             await self.ask_user_details(query, context)
         else:
-            await query.edit_message_text(
-                text=f"На жаль, {slot} {date} вже заброньовано. 😔❌"
+            outcome = f"На жаль, {slot} {date} вже заброньовано. 😔❌"
+            await query.edit_message_text(text=outcome)
+        return outcome
+
+    async def handle_waitlist_join(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        query = update.callback_query
+        await query.answer()
+
+        _, date, slot = query.data.split(":", 2)
+        username = query.from_user.username or query.from_user.first_name
+        position = self.waitlist.join(date, slot, query.from_user.id, username)
+        await query.edit_message_text(
+            text=(
+                f"Ви в черзі на {slot} {date} (№{position}) 🔔 Якщо слот звільниться, "
+                f"ми закріпимо його за вами на {self.waitlist.claim_window // 60} хвилин."
             )
+        )
 
     # User details logic
     async def ask_user_details(
@@ -170,10 +297,10 @@ class Handlers:
         user_details = update.message.text.strip()  # Correctly use update.message
         name, surname, phone = [item.strip() for item in user_details.split(",")]
 
-        # Save details to the database or update reservation
-        reservation_id = context.user_data.get("reservation_id")
-        if reservation_id:
-            self.db.update_user_details(reservation_id, name, surname, phone)
+        # Keep details on the draft until the reservation is committed
+        draft_id = await self.restore_draft(context)
+        if draft_id and self.db.update_draft_details(draft_id, name, surname, phone):
+            context.user_data["draft"] = self.db.draft_state(draft_id)
             await update.message.reply_text(
                 text="Дякуємо! Ваші дані успішно збережено. 😊✅"
             )
@@ -185,48 +312,64 @@ class Handlers:
                 text="Схоже, ваш ID бронювання відсутній. Будь ласка, спробуйте забронювати слот ще раз. 📞🛠️"
             )
 
+    async def restore_draft(self, context: ContextTypes.DEFAULT_TYPE) -> str | None:
+        """Returns the user's draft id, holding the draft again if the bot restarted since."""
+        draft_id = context.user_data.get("draft_id")
+        state = context.user_data.get("draft")
+        if not draft_id or draft_id in self.db.drafts or not state:
+            return draft_id
+        return await self.db.restore_draft(draft_id, state)
+
     # Payments logic
     async def ask_payment_preference(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Ask the user for their payment preference."""
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    "Оплатити онлайн 💳", callback_data="payment:online"
-                ),
-                InlineKeyboardButton(
-                    "Оплатити в кафе ☕", callback_data="payment:cafe"
-                ),
-            ]
-        ]
-
-        reply_markup = InlineKeyboardMarkup(keyboard)
         await update.message.reply_text(
             text="Як ви бажаєте оплатити своє бронювання? 💳☕",
-            reply_markup=reply_markup,
+            reply_markup=payment_keyboard(),
         )
 
     async def handle_payment_choice(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
-    ) -> None:
+    ) -> str:
+        """Commit the draft with the chosen payment; returns a short outcome for repeated taps."""
         query = update.callback_query
         await query.answer()
 
         choice = query.data.split(":")[1]  # Extract 'online' or 'cafe'
-        reservation_id = context.user_data.get("reservation_id")
+        draft_id = context.user_data.get("draft_id")
         user_id = query.from_user.id
 
+        if not draft_id:
+            outcome = "Схоже, ваш ID бронювання відсутній. Будь ласка, спробуйте забронювати слот ще раз. 📞🛠️"
+            await query.message.reply_text(text=outcome)
+            return outcome
+
+        try:
+            draft_id = await self.restore_draft(context)
+            if choice == "online":
+                reservation_id = await self.db.commit_draft(
+                    draft_id, "paid", f"payment_{user_id}_{draft_id}", "Онлайн"
+                )
+            else:
+                reservation_id = await self.db.commit_draft(draft_id, "pending", None, "В кафе")
+        except Exception as e:
+            if not is_backend_failure(e):
+                raise
+            # The draft still holds the slot; fresh buttons (a new message) let the user retry
+            outcome = BACKEND_UNAVAILABLE_TEXT + " Ваш слот ще закріплений за вами."
+            await query.message.reply_text(text=outcome, reply_markup=payment_keyboard())
+            return outcome
+
+        context.user_data.pop("draft_id", None)
+        context.user_data.pop("draft", None)
         if not reservation_id:
-            await update.message.reply_text(
-                text="Схоже, ваш ID бронювання відсутній. Будь ласка, спробуйте забронювати слот ще раз. 📞🛠️"
-            )
-            return
+            outcome = "На жаль, час на бронювання минув або слот уже зайнято. 😔 Спробуйте ще раз: /select_date"
+            await query.edit_message_text(text=outcome)
+            return outcome
 
         if choice == "online":
-            self.db.update_payment_status(
-                reservation_id, "paid", f"payment_{user_id}_{reservation_id}", "Онлайн"
-            )
             await query.edit_message_text(
                 text=(
                     "Ви обрали оплату онлайн. 🖥️💳 Ось реквізити для оплати:\n\n"
@@ -238,10 +381,10 @@ class Handlers:
             )
 
         elif choice == "cafe":
-            self.db.update_payment_status(reservation_id, "pending", None, "В кафе")
             await query.edit_message_text(
                 text="Ви обрали оплату в кафе. Будь ласка, приходьте вчасно. 😊☕"
             )
+        return "Бронювання підтверджено ✅"
 
     # User reservation view logic
     async def view_user_current_reservations(
@@ -249,65 +392,109 @@ class Handlers:
     ) -> None:
         user_id = update.message.from_user.id
 
-        reservations = self.db.get_user_current_reservations(user_id)
+        reservations = await self.db.get_user_current_reservations(user_id)
         if not reservations:
             await update.message.reply_text("У вас немає активних бронювань. 😔")
             return
 
-        message = "Ваші поточні бронювання:\n\n"
-        for reservation in reservations:
-            slot = reservation["slot"]
-            date = reservation["date"]
-            created_at = reservation["created_at"]
-            try:
-                created_at_dt = datetime.fromisoformat(created_at)
-                formatted_created_at = created_at_dt.strftime("%d.%m.%Y %H:%M")
-            except ValueError:
-                formatted_created_at = "Невідомий час"
-
-            message += (
-                f"📅 Дата: *{date}*\n"
-                f"⏰ Час: *{slot}*\n"
-                f"📝 Заброньовано: {formatted_created_at}\n"
-                f"-----------------------\n"
-            )
-
-        await update.message.reply_text(message, parse_mode="Markdown")
+        await reply_messages(
+            update.message,
+            render_reservations(
+                "Ваші поточні бронювання:\n\n", reservations, stale_note(reservations)
+            ),
+        )
 
     async def view_user_all_reservations(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         user_id = update.message.from_user.id
 
-        reservations = self.db.get_all_user_reservations(user_id)
+        reservations, has_previous, has_next = await self.db.get_user_reservations_page(user_id)
         if not reservations:
             await update.message.reply_text("У вас немає історії бронювань. 😔")
             return
 
-        message = "Історія ваших бронювань:\n\n"
-        for reservation in reservations:
-            slot = reservation["slot"]
-            date = reservation["date"]
-            created_at = reservation["created_at"]
-            try:
-                created_at_dt = datetime.fromisoformat(created_at)
-                formatted_created_at = created_at_dt.strftime("%d.%m.%Y %H:%M")
-            except ValueError:
-                formatted_created_at = "Невідомий час"
-
-            message += (
-                f"📅 Дата: *{date}*\n"
-                f"⏰ Час: *{slot}*\n"
-                f"📝 Заброньовано: {formatted_created_at}\n"
-                f"-----------------------\n"
+        await reply_messages(
+            update.message,
+            render_reservations(
+                "Історія ваших бронювань:\n\n", reservations, stale_note(reservations)
+            ),
+            reply_markup=history_keyboard(reservations, has_previous, has_next),
+        )
+
+    async def handle_history_page(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        query = update.callback_query
+        await query.answer()
+
+        # Extract direction and the (date, slot) cursor using maxsplit
+        _, direction, date, slot = query.data.split(":", 3)
+        cursor = {"after": (date, slot)} if direction == "next" else {"before": (date, slot)}
+
+        reservations, has_previous, has_next = await self.db.get_user_reservations_page(
+            query.from_user.id, **cursor
+        )
+        if not reservations:
+            await query.edit_message_text("Більше бронювань немає. 😔")
+            return
+
+        # A page of HISTORY_PAGE_SIZE reservations always fits in one message
+        (text,) = render_reservations(
+            "Історія ваших бронювань:\n\n", reservations, stale_note(reservations)
+        )
+        await query.edit_message_text(
+            text,
+            parse_mode="Markdown",
+            reply_markup=history_keyboard(reservations, has_previous, has_next),
+        )
+
+    # Staff export logic
+    async def export_reservations(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Send reservations for /export [first_date [last_date]] as a CSV document."""
+        if update.message.from_user.id not in Config.ADMIN_IDS:
+            await update.message.reply_text("Ця команда доступна лише персоналу. 🔒")
+            return
+
+        try:
+            first_date, last_date = parse_date_range(
+                context.args or [], self.db.get_current_time().split(" ")[0]
+            )
+        except ValueError:
+            await update.message.reply_text(
+                "Формат: /export РРРР-ММ-ДД [РРРР-ММ-ДД] 📆"
             )
+            return
 
-        await update.message.reply_text(message, parse_mode="Markdown")
+        # Rows are written page by page to a temporary file, but python-telegram-bot
+        # reads the whole file into memory to upload it, and bots may only send
+        # documents up to 50 MB; larger ranges have to go through the CLI.
+        with tempfile.TemporaryFile() as file:
+            stream = io.TextIOWrapper(file, encoding="utf-8", newline="")
+            count = await write_reservations_csv(self.db, first_date, last_date, stream)
+            stream.flush()
+            if file.tell() > EXPORT_DOCUMENT_MAX_BYTES:
+                stream.detach()
+                await update.message.reply_text(
+                    "Файл перевищує 50 МБ — оберіть коротший період або "
+                    "скористайтеся `python -m app.export`. 📦",
+                    parse_mode="Markdown",
+                )
+                return
+            file.seek(0)
+            await update.message.reply_document(
+                document=file,
+                filename=f"reservations_{first_date}_{last_date}.csv",
+                caption=f"Бронювань: {count} 📄",
+            )
+            stream.detach()
 
     # User canceling reservation logic
     async def cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         user_id = update.message.from_user.id
-        self.db.cancel_reservations(user_id)
+        await self.db.cancel_reservations(user_id)
         await update.message.reply_text("Ваші бронювання було скасовано. ❌")
 
     async def cancel_reservation(
@@ -316,45 +503,33 @@ class Handlers:
         user_id = update.message.from_user.id
 
         # Fetch all user reservations
-        reservations = self.db.get_user_current_reservations(user_id)
+        reservations = await self.db.get_user_current_reservations(user_id)
         if not reservations:
             await update.message.reply_text("У вас немає активних бронювань. 😔")
             return
 
-        # Build InlineKeyboard with reservation details
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    f"📅 {reservation["date"]} ⏰ {reservation["slot"]}",  # Display: Date and Slot
-                    callback_data=f"cancel:{reservation["date"]}:{reservation["slot"]}",  # Data: cancel:date:slot
-                )
-            ]
-            for reservation in reservations
-        ]
-
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # InlineKeyboard with reservation details
+        reply_markup = self.keyboards.cancel_picker(reservations)
         await update.message.reply_text(
             "Оберіть бронювання для скасування: ⬇", reply_markup=reply_markup
         )
 
     async def handle_cancel_reservation(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
-    ) -> None:
+    ) -> str:
         query = update.callback_query
         await query.answer()
 
-        # Extract "cancel", date, and slot using maxsplit
+        # Extract "cancel", date, and slot using maxsplit; slot carries the room when there are several
         prefix, date, slot = query.data.split(":", 2)
         if prefix != "cancel":
             raise ValueError("Дані зворотного виклику не починаються з 'cancel'")
 
         user_id = query.from_user.id
 
-        if self.db.cancel_slot(user_id, date, slot):
-            await query.edit_message_text(
-                text=f"Ваше бронювання на {date} о {slot} було успішно скасовано. ❌"
-            )
+        if await self.db.cancel_slot(user_id, date, slot):
+            outcome = f"Ваше бронювання на {date} о {slot} було успішно скасовано. ❌"
         else:
-            await query.edit_message_text(
-                text=f"Не вдалося скасувати бронювання на {date} о {slot}. Можливо, воно не існує. ⚠️"
-            )
+            outcome = f"Не вдалося скасувати бронювання на {date} о {slot}. Можливо, воно не існує. ⚠️"
+        await query.edit_message_text(text=outcome)
+        return outcome
@@ -0,0 +1,64 @@
+import asyncio
+import functools
+import logging
+
+from telegram import Update
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes
+
+from app.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Long enough to cover double taps and Telegram redeliveries, short enough that
+# tapping the same button again after a draft expires starts a new attempt.
+IDEMPOTENCY_TTL_SECONDS = 60
+IDEMPOTENCY_CACHE_SIZE = 4096
+ANSWER_MAX_LENGTH = 200  # Telegram's limit for callback query answers
+
+
+def callback_key(query):
+    message_id = query.message.message_id if query.message else query.inline_message_id
+    return query.from_user.id, query.data, message_id
+
+
+class CallbackDeduplicator:
+    """Runs a callback handler once per (user, callback data, message id).
+
+    A repeat of the same tap within the TTL never reaches the handler (or the
+    database): it waits for the first run if that is still in progress, then
+    answers the callback query with the outcome text the handler returned.
+    Runs that raise are forgotten so the user can retry.
+    """
+
+    def __init__(self, maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_TTL_SECONDS):
+        self.outcomes = TTLCache(maxsize=maxsize, ttl=ttl)  # key -> Future of the outcome text
+        self.duplicates = 0
+
+    def wrap(self, callback):
+        @functools.wraps(callback)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            query = update.callback_query
+            key = callback_key(query)
+            outcome = self.outcomes.get(key)
+            if outcome is not None:
+                self.duplicates += 1
+                text = await asyncio.shield(outcome)
+                try:
+                    await query.answer(text[:ANSWER_MAX_LENGTH] if text else None)
+                except BadRequest:
+                    pass  # A redelivered update carries a query that was already answered
+                return None
+
+            outcome = asyncio.get_running_loop().create_future()
+            self.outcomes.set(key, outcome)
+            try:
+                text = await callback(update, context)
+            except BaseException:
+                self.outcomes.invalidate(key)
+                outcome.set_result(None)  # Waiting repeats just acknowledge the tap
+                raise
+            outcome.set_result(text)
+            return text
+
+        return wrapper
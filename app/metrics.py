@@ -0,0 +1,135 @@
+import functools
+import logging
+import time
+from bisect import bisect_left
+
+from telegram.ext import CallbackQueryHandler, CommandHandler
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DB_OPERATIONS = (
+    "get_available_slots",
+    "get_available_slots_for_dates",
+    "get_free_windows",
+    "get_reserved_rows",
+    "hold_slot",
+    "commit_draft",
+    "get_user_current_reservations",
+    "get_user_reservations_page",
+    "get_upcoming_reservations",
+    "cancel_slot",
+    "cancel_reservations",
+)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+
+def escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Latency histograms and error counts, rendered in the Prometheus text format.
+
+    Nothing is measured unless handlers or the database are explicitly
+    instrumented, so a disabled endpoint costs nothing on the hot path.
+    """
+
+    def __init__(self):
+        self.families = {}  # metric name -> {label value: Histogram}
+        self.gauges = {}  # metric name -> callable returning a number
+
+    def histogram(self, family, label):
+        histograms = self.families.setdefault(family, {})
+        if label not in histograms:
+            histograms[label] = Histogram()
+        return histograms[label]
+
+    def timed(self, family, label, func):
+        histogram = self.histogram(family, label)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                histogram.errors += 1
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    def add_gauge(self, name, read):
+        self.gauges[name] = read
+
+    # Instrumentation
+    def instrument_handlers(self, application):
+        """Wrap every registered handler callback, keyed by its command or pattern."""
+        for handlers in application.handlers.values():
+            for handler in handlers:
+                handler.callback = self.timed("handler", handler_label(handler), handler.callback)
+
+    def instrument_database(self, db):
+        for operation in DB_OPERATIONS:
+            setattr(db, operation, self.timed("db", operation, getattr(db, operation)))
+
+    # Exposition
+    def render(self):
+        lines = []
+        for family, histograms in self.families.items():
+            name = f"bot_{family}_latency_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for label, histogram in histograms.items():
+                label = f'{family}="{escape(label)}"'
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{label}}} {cumulative}")
+
+            errors = f"bot_{family}_errors_total"
+            lines.append(f"# TYPE {errors} counter")
+            for label, histogram in histograms.items():
+                lines.append(f'{errors}{{{family}="{escape(label)}"}} {histogram.errors}')
+
+        for name, read in self.gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {read()}")
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, host, port):
+        """Serve GET /metrics; returns the runner so the caller can clean it up."""
+        from aiohttp import web  # Only needed when metrics are enabled
+
+        async def handle_metrics(request):
+            return web.Response(text=self.render(), content_type="text/plain")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logger.info("Serving metrics on %s:%s/metrics", host, port)
+        return runner
+
+
+def handler_label(handler):
+    if isinstance(handler, CommandHandler):
+        return "/" + sorted(handler.commands)[0]
+    if isinstance(handler, CallbackQueryHandler) and handler.pattern is not None:
+        return getattr(handler.pattern, "pattern", str(handler.pattern))
+    return type(handler).__name__
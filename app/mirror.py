@@ -0,0 +1,188 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from app.slots import AvailabilityIndex
+
+logger = logging.getLogger(__name__)
+
+MIRROR_DAYS = 7  # Today plus the six days shown by /select_date
+RECONNECT_DELAY_SECONDS = 5
+
+
+class ReservationMirror:
+    """In-memory copy of upcoming reservations kept current from a change feed.
+
+    The mirror loads today + ``days`` once, then applies insert/update/delete
+    events. It reloads whenever the feed (re)subscribes, and it stops
+    answering while it is out of sync, so Database falls back to querying.
+    """
+
+    def __init__(self, db, days=MIRROR_DAYS):
+        self.db = db
+        self.days = days
+        self.index = AvailabilityIndex(db.grid)
+        self.rows = {}  # reservation id -> (date, slot, room)
+        self.synced = False
+        self.loaded_window = None
+        self.resyncs = 0
+        self.events_applied = 0
+        self._resync_task = None
+        self._buffer = None  # Events received while a resync is loading
+
+    def window(self):
+        today = datetime.now(self.db.timezone).date()
+        last = today + timedelta(days=self.days - 1)
+        return today.isoformat(), last.isoformat()
+
+    def covers(self, first_date, last_date):
+        if not self.synced:
+            return False
+        if self.loaded_window != self.window():
+            self.on_subscribed()  # The day rolled over; load the new window in the background
+            return False
+        return self.loaded_window[0] <= first_date and last_date <= self.loaded_window[1]
+
+    # Sync
+    async def resync(self):
+        self.synced = False
+        self._buffer = []
+        window = self.window()
+        try:
+            rows = await self.db.get_reserved_rows(*window)
+        except Exception:
+            self._buffer = None
+            raise
+
+        self.index = AvailabilityIndex(self.db.grid)
+        self.rows = {}
+        for row in rows:
+            self._add(row)
+
+        # Replay what arrived during the load; applying an event twice is harmless
+        buffered, self._buffer = self._buffer, None
+        for payload in buffered:
+            self.on_change(payload)
+
+        self.loaded_window = window
+        self.synced = True
+        self.resyncs += 1
+        logger.info("Reservation mirror loaded %d rows for %s..%s", len(rows), *window)
+
+    def on_subscribed(self):
+        if self._resync_task is None or self._resync_task.done():
+            self._resync_task = asyncio.create_task(self.resync())
+
+    def on_disconnected(self):
+        self.synced = False
+
+    # Change events
+    def _add(self, row):
+        room = row.get("room")
+        self.rows[row["id"]] = (row["date"], row["slot"], room)
+        self.index.add(row["date"], row["slot"], room)
+
+    def _remove(self, row_id):
+        entry = self.rows.pop(row_id, None)
+        if entry:
+            self.index.remove(*entry)
+
+    def on_change(self, payload):
+        """Apply a Supabase Realtime postgres_changes payload."""
+        if self._buffer is not None:
+            self._buffer.append(payload)
+            return
+
+        data = payload.get("data", payload)
+        change = data.get("type", "").upper()
+        record = data.get("record") or {}
+        old_record = data.get("old_record") or {}
+
+        if change in ("UPDATE", "DELETE"):
+            self._remove(old_record.get("id", record.get("id")))
+        if change in ("INSERT", "UPDATE") and record.get("id") is not None:
+            first, last = self.window()
+            if first <= record["date"] <= last:
+                self._add(record)
+        self.events_applied += 1
+
+    def apply_local_insert(self, row):
+        """Apply a reservation this process wrote, ahead of its Realtime event.
+
+        Otherwise the bot's own next availability answer (such as the
+        waitlist offer after a cancellation) could predate its write. The
+        feed's copy of the event arrives later and changes nothing.
+        """
+        self.on_change({"type": "INSERT", "record": row})
+
+    def apply_local_delete(self, row):
+        self.on_change({"type": "DELETE", "old_record": row})
+
+    def stats(self):
+        return {
+            "synced": self.synced,
+            "rows": len(self.rows),
+            "resyncs": self.resyncs,
+            "events_applied": self.events_applied,
+        }
+
+
+class RealtimeChangeFeed:
+    """Feeds postgres_changes on the reservations table to a mirror over Supabase Realtime.
+
+    Deletes only identify the row by id unless the table uses REPLICA
+    IDENTITY FULL; the mirror keeps an id -> slot map for that reason.
+    """
+
+    def __init__(self, realtime_client):
+        self.client = realtime_client
+
+    async def _listen_until_closed(self):
+        """Listen until the socket closes.
+
+        Without auto_reconnect the client's listen() only returns once its
+        next heartbeat fails, up to half a minute after the drop; the mirror
+        must stop answering from memory as soon as events can be missed.
+        """
+        listen = asyncio.ensure_future(self.client.listen())
+        closed = asyncio.ensure_future(self.client.ws_connection.wait_closed())
+        try:
+            await asyncio.wait((listen, closed), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (listen, closed):
+                task.cancel()
+            await asyncio.gather(listen, closed, return_exceptions=True)
+        if listen.done() and not listen.cancelled() and listen.exception():
+            raise listen.exception()
+
+    async def _close(self):
+        self.client.is_connected = False  # Stops the client's heartbeat loop
+        connection = getattr(self.client, "ws_connection", None)
+        if connection is not None:
+            await connection.close()
+
+    async def run(self, mirror):
+        from realtime import RealtimeSubscribeStates
+
+        def on_subscribe(state, error):
+            if state == RealtimeSubscribeStates.SUBSCRIBED:
+                mirror.on_subscribed()
+            else:
+                logger.warning("Reservation change feed %s: %s", state, error)
+                mirror.on_disconnected()
+
+        while True:
+            try:
+                await self.client.connect()
+                channel = self.client.channel("reservations-mirror")
+                channel.on_postgres_changes("*", table="reservations", callback=mirror.on_change)
+                await channel.subscribe(on_subscribe)
+                await self._listen_until_closed()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Reservation change feed dropped: %s", e)
+
+            mirror.on_disconnected()
+            await self._close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
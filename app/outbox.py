@@ -0,0 +1,222 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+
+from telegram.error import RetryAfter, TelegramError
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes: lower values are sent first
+INTERACTIVE = 0
+REMINDER = 1
+BULK = 2
+
+# Telegram allows ~30 messages/s overall and ~1 message/s per chat. Handler
+# replies are charged to the same buckets (see ReplyRateLimiter); the global
+# rate is kept below 30 to leave headroom for calls that are not charged.
+GLOBAL_RATE = 25
+PER_CHAT_RATE = 1
+IDLE_BUCKET_SECONDS = 60  # Per-chat buckets unused for this long are dropped
+
+# Bot API methods that count against Telegram's message limits
+CHARGED_ENDPOINT_PREFIXES = ("send", "edit", "copy", "forward")
+
+_sending_from_queue = contextvars.ContextVar("sending_from_queue", default=False)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Consume a token; returns 0 on success or the seconds to wait for one."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def charge(self):
+        """Consume a token even if none is left, going into debt.
+
+        Returns the seconds to wait only once the debt exceeds the bucket's
+        capacity, i.e. when charged calls alone run over the rate.
+        """
+        if self.take():
+            self.tokens -= 1
+        return max(0.0, -self.tokens - self.capacity) / self.rate
+
+
+class MessageQueue:
+    """Paces outbound messages through global and per-chat token buckets.
+
+    Messages are dispatched by priority lane. A RetryAfter from Telegram pauses
+    the whole queue once for the requested time and the message is re-queued,
+    instead of every pending send retrying on its own.
+    """
+
+    def __init__(self, bot, global_rate=GLOBAL_RATE, per_chat_rate=PER_CHAT_RATE):
+        self.bot = bot
+        self.per_chat_rate = per_chat_rate
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_buckets = {}
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._queue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._paused_until = 0.0
+        self._worker = None
+        self._in_flight = set()
+        self._delayed = 0  # Items waiting on a per-chat bucket outside the queue
+
+    def send_message(self, chat_id, text, priority=REMINDER, **kwargs):
+        """Queue a message; returns a future resolved with the sent Message or None."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._put((priority, next(self._order), chat_id, text, kwargs, future))
+        return future
+
+    def _put(self, item):
+        self._queue.put_nowait(item)
+
+    def _put_delayed(self, item):
+        self._delayed -= 1
+        self._put(item)
+
+    def pending(self):
+        return self._queue.qsize() + self._delayed + len(self._in_flight)
+
+    def _chat_bucket(self, chat_id):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) > 1000:
+                cutoff = time.monotonic() - IDLE_BUCKET_SECONDS
+                self.chat_buckets = {
+                    chat: b for chat, b in self.chat_buckets.items() if b.updated > cutoff
+                }
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, capacity=1)
+        return bucket
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            chat_id = item[2]
+
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            # A chat over its limit is retried later without holding up other chats
+            chat_wait = self._chat_bucket(chat_id).take()
+            if chat_wait:
+                self._delayed += 1
+                asyncio.get_running_loop().call_later(chat_wait, self._put_delayed, item)
+                continue
+
+            while wait := self.global_bucket.take():
+                await asyncio.sleep(wait)
+
+            task = asyncio.create_task(self._send(item))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    def charge(self, chat_id=None):
+        """Charge a message sent outside the queue; returns the seconds it should wait.
+
+        Handler replies use this so they never wait behind queued messages:
+        their tokens are taken straight away and the queued lanes slow down
+        to pay back the debt.
+        """
+        wait = self.global_bucket.charge()
+        if chat_id is not None:
+            self._chat_bucket(chat_id).charge()
+        return max(wait, self._paused_until - time.monotonic())
+
+    def pause(self, seconds):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def _send(self, item):
+        _, _, chat_id, text, kwargs, future = item
+        _sending_from_queue.set(True)  # Already paced; see ReplyRateLimiter
+        try:
+            message = await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        except RetryAfter as e:
+            self.retried += 1
+            self.pause(e.retry_after)
+            self._put(item)
+            return
+        except TelegramError as e:
+            self.failed += 1
+            logger.warning("Failed to send message to %s: %s", chat_id, e)
+            future.set_result(None)
+            return
+
+        self.sent += 1
+        future.set_result(message)
+
+    async def stop(self, timeout=10):
+        """Deliver what is still queued (up to ``timeout`` seconds), then stop."""
+        if self._worker is None:
+            return
+        deadline = time.monotonic() + timeout
+        while self.pending() and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        self._worker.cancel()
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._worker = None
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() + self._delayed,
+            "in_flight": len(self._in_flight),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+
+class ReplyRateLimiter(BaseRateLimiter):
+    """Charges every other Bot API message call to a MessageQueue's buckets.
+
+    Handler replies and edits go straight to Telegram rather than through the
+    queue's lanes, so interactive traffic always beats reminders: it takes
+    its tokens first and the queue waits for them to refill. Replies only
+    wait themselves while the queue is paused by a RetryAfter, or when they
+    alone exceed the global rate.
+    """
+
+    def __init__(self):
+        self.queue = None  # Set once the MessageQueue exists; it needs the bot
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        if (
+            self.queue is not None
+            and not _sending_from_queue.get()
+            and endpoint.startswith(CHARGED_ENDPOINT_PREFIXES)
+        ):
+            wait = self.queue.charge(data.get("chat_id"))
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self.queue.retried += 1
+                self.queue.pause(e.retry_after)
+                raise
+        return await callback(*args, **kwargs)
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import sqlite3
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+)
+"""
+
+
+class SQLitePersistence(BasePersistence):
+    """Stores user, chat and bot data as JSON rows in a local SQLite file.
+
+    Writes are buffered: the Application hands over changed entries every
+    ``update_interval`` seconds, and all of them are committed together in a
+    single transaction off the event loop.
+    """
+
+    def __init__(self, path, update_interval=60):
+        super().__init__(
+            store_data=PersistenceInput(callback_data=False),
+            update_interval=update_interval,
+        )
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(SCHEMA)
+        self._connection.commit()
+        self._pending = {}  # (kind, key) -> JSON text, or None to delete
+        self._write_task = None
+        self._write_lock = asyncio.Lock()
+
+    # Loading
+    def _load(self, kind):
+        rows = self._connection.execute(
+            "SELECT key, data FROM state WHERE kind = ?", (kind,)
+        ).fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    async def get_user_data(self):
+        return {int(key): data for key, data in self._load("user").items()}
+
+    async def get_chat_data(self):
+        return {int(key): data for key, data in self._load("chat").items()}
+
+    async def get_bot_data(self):
+        return self._load("bot").get("bot", {})
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        return {
+            tuple(json.loads(key)): state
+            for key, state in self._load(f"conversation:{name}").items()
+        }
+
+    # Buffered writes
+    def _queue(self, kind, key, data):
+        self._pending[(kind, str(key))] = None if data is None else json.dumps(data)
+        if self._write_task is None or self._write_task.done():
+            # Runs once the Application has handed over every changed entry
+            self._write_task = asyncio.create_task(self._write())
+
+    def _commit(self, pending):
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO state (kind, key, data) VALUES (?, ?, ?) "
+                "ON CONFLICT (kind, key) DO UPDATE SET data = excluded.data",
+                [(kind, key, data) for (kind, key), data in pending.items() if data is not None],
+            )
+            self._connection.executemany(
+                "DELETE FROM state WHERE kind = ? AND key = ?",
+                [(kind, key) for (kind, key), data in pending.items() if data is None],
+            )
+
+    async def _write(self):
+        async with self._write_lock:
+            while self._pending:
+                pending, self._pending = self._pending, {}
+                await asyncio.to_thread(self._commit, pending)
+                logger.debug("Persisted %d state entries", len(pending))
+
+    async def update_user_data(self, user_id, data):
+        self._queue("user", user_id, data)
+
+    async def update_chat_data(self, chat_id, data):
+        self._queue("chat", chat_id, data)
+
+    async def update_bot_data(self, data):
+        self._queue("bot", "bot", data)
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def update_conversation(self, name, key, new_state):
+        self._queue(f"conversation:{name}", json.dumps(list(key)), new_state)
+
+    async def drop_user_data(self, user_id):
+        self._queue("user", user_id, None)
+
+    async def drop_chat_data(self, chat_id):
+        self._queue("chat", chat_id, None)
+
+    # State lives in this process only, so there is nothing to refresh
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    async def flush(self):
+        await self._write()
+        self._connection.close()
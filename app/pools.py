@@ -0,0 +1,148 @@
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from telegram.request import HTTPXRequest
+
+from app.config import Config
+
+
+class PoolStats:
+    """Counts requests and newly opened connections going through one client's pool.
+
+    ``in_flight`` includes requests still waiting for a connection, so a
+    utilization above 1 means requests are queueing on the pool.
+    ``connections_opened`` only grows when no idle keep-alive connection could
+    be reused, so comparing it with ``requests`` shows how warm the pool is.
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    async def trace(self, event, info):
+        # httpcore trace extension, called around each connection step
+        if event == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def utilization(self):
+        return self.in_flight / self.size
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "utilization": self.utilization(),
+        }
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that reports its traffic to a PoolStats."""
+
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.pool_stats = stats
+
+    async def handle_async_request(self, request):
+        request.extensions.setdefault("trace", self.pool_stats.trace)
+        self.pool_stats.requests += 1
+        self.pool_stats.in_flight += 1
+        self.pool_stats.peak_in_flight = max(
+            self.pool_stats.peak_in_flight, self.pool_stats.in_flight
+        )
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.pool_stats.in_flight -= 1
+
+
+def pool_limits():
+    return httpx.Limits(
+        max_connections=Config.HTTP_POOL_SIZE,
+        max_keepalive_connections=Config.HTTP_POOL_SIZE,
+        keepalive_expiry=Config.HTTP_KEEPALIVE_SECONDS,
+    )
+
+
+def pool_timeout():
+    return httpx.Timeout(
+        Config.HTTP_READ_TIMEOUT,
+        connect=Config.HTTP_CONNECT_TIMEOUT,
+        pool=Config.HTTP_POOL_TIMEOUT,
+    )
+
+
+def pooled_transport(stats, **kwargs):
+    return PooledTransport(stats, limits=pool_limits(), http2=Config.HTTP2, **kwargs)
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    def __init__(self, base_url, *, pool_stats, **kwargs):
+        self.pool_stats = pool_stats  # Needed by create_session, called from the base __init__
+        super().__init__(base_url, **kwargs)
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            transport=pooled_transport(self.pool_stats, verify=verify, proxy=proxy),
+        )
+
+
+def supabase_rest_client(supabase_url, supabase_key):
+    """PostgREST client for a Supabase project, on the configured pool.
+
+    Built directly rather than through supabase.AsyncClient, which would
+    also import and construct the auth, storage and functions clients the
+    bot never uses.
+    """
+    headers = {
+        **DEFAULT_POSTGREST_CLIENT_HEADERS,
+        "apiKey": supabase_key,
+        "Authorization": f"Bearer {supabase_key}",
+    }
+    return PooledPostgrestClient(
+        f"{supabase_url}/rest/v1",
+        pool_stats=PoolStats("supabase", Config.HTTP_POOL_SIZE),
+        headers=headers,
+        timeout=pool_timeout(),
+    )
+
+
+def supabase_realtime_client(supabase_url, supabase_key):
+    """Realtime client for a Supabase project; realtime is only imported when the mirror runs.
+
+    The client's own reconnect rejoins channels without their postgres_changes
+    config and without telling the subscriber, so it is turned off:
+    RealtimeChangeFeed reconnects itself and resyncs the mirror.
+    """
+    from realtime import AsyncRealtimeClient
+
+    return AsyncRealtimeClient(
+        f"{supabase_url}/realtime/v1".replace("http", "ws", 1),
+        token=supabase_key,
+        auto_reconnect=False,
+    )
+
+
+def telegram_request(stats):
+    """Returns the HTTPXRequest for Bot API calls, sized and tuned like the Supabase pool."""
+    return HTTPXRequest(
+        connection_pool_size=Config.HTTP_POOL_SIZE,
+        read_timeout=Config.HTTP_READ_TIMEOUT,
+        connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+        pool_timeout=Config.HTTP_POOL_TIMEOUT,
+        http_version="2" if Config.HTTP2 else "1.1",
+        httpx_kwargs={"transport": pooled_transport(stats)},
+    )
@@ -0,0 +1,145 @@
+import re
+from datetime import datetime
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.cache import TTLCache
+from app.slots import SlotGrid
+
+MESSAGE_MAX_LENGTH = 4096  # Telegram's limit for message text, in UTF-16 code units
+KEYBOARD_CACHE_SIZE = 1024
+KEYBOARD_CACHE_TTL_SECONDS = 3600
+
+# Both the bot's "YYYY-MM-DD HH:MM:SS" and Postgres' ISO timestamps start like this
+CREATED_AT_PREFIX = re.compile(r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})")
+
+
+def text_length(text: str) -> int:
+    """Length as Telegram counts it: emoji outside the BMP take two units."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def format_created_at(created_at) -> str:
+    """Formats a reservation's created_at as DD.MM.YYYY HH:MM."""
+    match = CREATED_AT_PREFIX.match(created_at or "")
+    if match:
+        year, month, day, hour, minute = match.groups()
+        return f"{day}.{month}.{year} {hour}:{minute}"
+    try:
+        return datetime.fromisoformat(created_at).strftime("%d.%m.%Y %H:%M")
+    except (TypeError, ValueError):
+        return "Невідомий час"
+
+
+def render_reservation(reservation: dict) -> str:
+    room = reservation.get("room")
+    return (
+        f"📅 Дата: *{reservation['date']}*\n"
+        f"⏰ Час: *{reservation['slot']}*\n"
+        + (f"🚪 Кімната: *{room}*\n" if room is not None else "")
+        + f"📝 Заброньовано: {format_created_at(reservation['created_at'])}\n"
+        f"-----------------------\n"
+    )
+
+
+def render_reservations(
+    header: str, reservations: list[dict], footer: str = "", limit: int = MESSAGE_MAX_LENGTH
+) -> list[str]:
+    """Renders reservations as Markdown under a header, split into messages of at most ``limit``.
+
+    Messages break between reservations; the header opens the first message
+    and the footer closes the last.
+    """
+    messages = []
+    parts, length = [header], text_length(header)
+    for reservation in reservations:
+        row = render_reservation(reservation)
+        row_length = text_length(row)
+        if length + row_length > limit and length:
+            messages.append("".join(parts))
+            parts, length = [], 0
+        parts.append(row)
+        length += row_length
+
+    if footer:
+        if length + text_length(footer) > limit:
+            messages.append("".join(parts))
+            parts, footer = [], footer.lstrip()
+        parts.append(footer)
+    messages.append("".join(parts))
+    return messages
+
+
+class KeyboardCache:
+    """Inline keyboards for the date, slot, waitlist and cancel pickers, built once per content.
+
+    Each keyboard is keyed by its date together with the free slots (or
+    reservations) it shows, which is its availability version: a booking or
+    cancellation changes the key, so a cached keyboard is never out of date.
+    Keyboards are immutable and shared between users.
+    """
+
+    def __init__(self, maxsize=KEYBOARD_CACHE_SIZE, ttl=KEYBOARD_CACHE_TTL_SECONDS):
+        self.keyboards = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _get(self, key, build):
+        keyboard = self.keyboards.get(key)
+        if keyboard is None:
+            keyboard = InlineKeyboardMarkup(build())
+            self.keyboards.set(key, keyboard)
+        return keyboard
+
+    def date_picker(self, week_slots: dict, waitlist: bool) -> InlineKeyboardMarkup:
+        counts = tuple((date, len(slots)) for date, slots in week_slots.items())
+        return self._get(
+            ("dates", counts, waitlist),
+            lambda: [
+                [
+                    InlineKeyboardButton(
+                        f"{date} — вільних місць: {count}"
+                        if count
+                        else f"{date} — все зайнято, черга очікування 🔔",
+                        callback_data=date,
+                    )
+                ]
+                for date, count in counts
+            ],
+        )
+
+    def slot_picker(self, date: str, slots: list[str]) -> InlineKeyboardMarkup:
+        slots = tuple(slots)
+        return self._get(
+            ("slots", date, slots),
+            lambda: [[InlineKeyboardButton(slot, callback_data=f"{date} {slot}")] for slot in slots],
+        )
+
+    def waitlist_picker(self, date: str, slots: list[str]) -> InlineKeyboardMarkup:
+        slots = tuple(slots)
+        return self._get(
+            ("waitlist", date, slots),
+            lambda: [
+                [InlineKeyboardButton(f"{slot} 🔔", callback_data=f"waitlist:{date}:{slot}")]
+                for slot in slots
+            ],
+        )
+
+    def cancel_picker(self, reservations: list[dict]) -> InlineKeyboardMarkup:
+        booked = tuple(
+            (reservation["date"], SlotGrid.slot_key(reservation["slot"], reservation.get("room")))
+            for reservation in reservations
+        )
+        return self._get(
+            ("cancel", booked),
+            lambda: [
+                [
+                    InlineKeyboardButton(
+                        f"📅 {date} ⏰ {key}",  # Display: Date and Slot (and room)
+                        callback_data=f"cancel:{date}:{key}",  # Data: cancel:date:slot key
+                    )
+                ]
+                for date, key in booked
+            ],
+        )
+
+    def stats(self):
+        return self.keyboards.stats()
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+
+import httpx
+from postgrest.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+BREAKER_CLOSED = 0
+BREAKER_HALF_OPEN = 1
+BREAKER_OPEN = 2
+BREAKER_STATES = {BREAKER_CLOSED: "closed", BREAKER_HALF_OPEN: "half-open", BREAKER_OPEN: "open"}
+
+
+class BackendUnavailable(Exception):
+    """Raised instead of calling Supabase while the circuit breaker is open."""
+
+
+def is_backend_failure(error):
+    """True for errors that say Supabase is unhealthy, not that the request was wrong.
+
+    Timeouts and transport errors count, as do HTTP 5xx responses and Postgres
+    errors of classes 5x (resources, limits, operator intervention) or
+    PostgREST's PGRST00x connection errors. Constraint violations and other
+    client errors do not.
+    """
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError, BackendUnavailable)):
+        return True
+    if isinstance(error, APIError):
+        return str(error.code or "").startswith(("5", "PGRST00"))
+    return False
+
+
+_abandoned = set()  # Losing hedged attempts, kept referenced until they finish
+
+
+def _abandon(task):
+    """Lets an attempt run to completion in the background, discarding its outcome.
+
+    Cancelling an httpx request mid-flight can leave its pooled connection
+    unusable until the pool times out, which stalled later requests for the
+    whole deadline under load; a finished request returns it cleanly.
+    """
+    if task.done():
+        if not task.cancelled():
+            task.exception()  # Retrieved, so it is not logged as unhandled
+        return
+    _abandoned.add(task)
+    task.add_done_callback(_abandoned.discard)
+    task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+
+async def hedged(attempt, hedge_after, on_hedge=None):
+    """Awaits ``attempt()``; if it is still running after ``hedge_after`` seconds,
+    starts a second copy and returns whichever succeeds first.
+
+    Only for idempotent requests. Raises the last error if both attempts fail.
+    The slower attempt is left to finish rather than cancelled.
+    """
+    first = asyncio.ensure_future(attempt())
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            if on_hedge:
+                on_hedge()
+            tasks.add(asyncio.ensure_future(attempt()))
+
+        pending = set(tasks)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            if not pending:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            _abandon(task)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated backend failures, then lets a single probe through.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call raises BackendUnavailable without touching the network. Once
+    ``reset_timeout`` seconds have passed, one call is let through: success
+    closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self.hedges = 0
+
+    def allow(self):
+        if self.state == BREAKER_CLOSED:
+            return True
+        if self.state == BREAKER_OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = BREAKER_HALF_OPEN  # This caller is the probe
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != BREAKER_CLOSED:
+            logger.info("Supabase circuit breaker closed")
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN or (
+            self.state == BREAKER_CLOSED and self.failures >= self.failure_threshold
+        ):
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            logger.warning("Supabase circuit breaker opened after %d failures", self.failures)
+
+    async def call(self, attempt, deadline, hedge_after=None):
+        """Runs ``attempt()`` under ``deadline`` seconds, hedged if ``hedge_after`` is given."""
+        if not self.allow():
+            self.rejected += 1
+            raise BackendUnavailable("Supabase circuit breaker is open")
+
+        def count_hedge():
+            self.hedges += 1
+
+        request = hedged(attempt, hedge_after, count_hedge) if hedge_after else attempt()
+        try:
+            result = await asyncio.wait_for(request, deadline)
+        except asyncio.CancelledError:
+            if self.state == BREAKER_HALF_OPEN:
+                self.state = BREAKER_OPEN  # The probe never finished; wait for another
+                self.opened_at = time.monotonic()
+            raise
+        except Exception as e:
+            if is_backend_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()  # The backend answered; the request itself was refused
+            raise
+        self.record_success()
+        return result
+
+    def stats(self):
+        return {
+            "state": BREAKER_STATES[self.state],
+            "failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "hedges": self.hedges,
+        }
+
+
+class StaleResult(list):
+    """Rows served from the last-known-good snapshot while Supabase is unavailable.
+
+    ``taken_at`` is the wall-clock time the rows were fetched.
+    """
+
+    def __init__(self, rows, taken_at):
+        super().__init__(rows)
+        self.taken_at = taken_at
+
+
+def is_stale(result):
+    return isinstance(result, StaleResult)
@@ -1,29 +1,101 @@
+import heapq
+import logging
 from datetime import datetime, timedelta
 
-from apscheduler.schedulers.background import BackgroundScheduler
+from telegram.ext import Application, ContextTypes
 
+from app.outbox import REMINDER
 
-def check_for_reminders(application, db):
-    now = datetime.now()
-    reminder_time = now + timedelta(minutes=15)
-    reminder_time_str = reminder_time.strftime("%Y-%m-%d %H:%M:%S")
+logger = logging.getLogger(__name__)
 
-    upcoming_reservations = db.execute_query(
-        "SELECT slot, user_id FROM reservations WHERE slot = ?",
-        (reminder_time_str,),
-        fetch_all=True,
-    )
+REMINDER_LEAD_TIME = timedelta(minutes=15)  # Remind users 15 minutes before their slot
 
-    for slot, user_id in upcoming_reservations:
-        application.bot.send_message(
-            chat_id=user_id,
-            text=f"Reminder: Your playroom reservation is at {slot}. Please arrive on time!",
-        )
 
+class ReminderEngine:
+    """Keeps upcoming reservations in a time-ordered heap and fires reminders from the JobQueue.
 
-def setup_scheduler(application, db):
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(
-        check_for_reminders, "interval", minutes=1, args=[application, db]
-    )
-    scheduler.start()
+    Reservations are loaded once at startup and then kept current through the
+    Database listener hooks, so the only scheduled job is the one for the
+    earliest pending reminder.
+    """
+
+    def __init__(self, application: Application, db, outbox, lead_time=REMINDER_LEAD_TIME):
+        self.application = application
+        self.db = db
+        self.outbox = outbox
+        self.lead_time = lead_time
+        self._heap = []  # (remind_at, (date, slot, user_id))
+        self._pending = set()  # Keys still waiting for a reminder; cancelled ones are dropped lazily
+        self._job = None
+        self._job_time = None
+
+    def remind_at(self, date, slot):
+        slot_time = datetime.strptime(f"{date} {slot}", "%Y-%m-%d %H:%M")
+        return self.db.timezone.localize(slot_time) - self.lead_time
+
+    async def load(self, context: ContextTypes.DEFAULT_TYPE = None) -> None:
+        """Load every upcoming reservation into the heap."""
+        for reservation in await self.db.get_upcoming_reservations():
+            self.reservation_added(
+                reservation["date"], reservation["slot"], reservation["user_id"]
+            )
+        logger.info("Loaded %d upcoming reminders", len(self._pending))
+
+    # Database listener hooks
+    def reservation_added(self, date, slot, user_id):
+        key = (date, slot, user_id)
+        remind_at = self.remind_at(date, slot)
+        if key in self._pending or remind_at + self.lead_time <= datetime.now(self.db.timezone):
+            return
+
+        self._pending.add(key)
+        heapq.heappush(self._heap, (remind_at, key))
+        self._schedule()
+
+    def reservation_removed(self, date, slot, user_id):
+        self._pending.discard((date, slot, user_id))
+
+    # Job scheduling
+    def _schedule(self):
+        """Make sure a job is scheduled for the earliest pending reminder."""
+        while self._heap and self._heap[0][1] not in self._pending:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+
+        remind_at = self._heap[0][0]
+        if self._job is not None and self._job_time <= remind_at:
+            return
+        if self._job is not None:
+            self._job.schedule_removal()
+
+        delay = max(remind_at - datetime.now(self.db.timezone), timedelta(0))
+        self._job = self.application.job_queue.run_once(self._fire, when=delay, name="reminders")
+        self._job_time = remind_at
+
+    async def _fire(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        self._job = None
+        now = datetime.now(self.db.timezone)
+
+        while self._heap and self._heap[0][0] <= now:
+            _, key = heapq.heappop(self._heap)
+            if key not in self._pending:
+                continue
+            self._pending.discard(key)
+
+            # Paced by the outbound queue, so a busy hour doesn't trip flood limits
+            date, slot, user_id = key
+            self.outbox.send_message(
+                user_id,
+                f"Нагадування: ваше бронювання ігрової кімнати сьогодні о {slot} ⏰ Будь ласка, приходьте вчасно! 😊",
+                priority=REMINDER,
+            )
+
+        self._schedule()
+
+
+def setup_scheduler(application: Application, db, outbox) -> ReminderEngine:
+    engine = ReminderEngine(application, db, outbox)
+    db.add_listener(engine)
+    application.job_queue.run_once(engine.load, when=0, name="load_reminders")
+    return engine
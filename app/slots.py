@@ -0,0 +1,113 @@
+from collections import defaultdict
+
+
+def to_minutes(label):
+    hours, minutes = label.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class SlotGrid:
+    """Maps the slots of a day to bit positions.
+
+    Bit ``i`` of a mask stands for the i-th slot of the day, so availability
+    for a room is one integer and lookups are bit operations.
+    """
+
+    def __init__(self, first_slot="10:00", last_slot="21:00", slot_minutes=60, rooms=()):
+        self.slot_minutes = slot_minutes
+        first, last = to_minutes(first_slot), to_minutes(last_slot)
+        self.starts = list(range(first, last + 1, slot_minutes))
+        self.labels = [f"{start // 60:02d}:{start % 60:02d}" for start in self.starts]
+        self.positions = {label: index for index, label in enumerate(self.labels)}
+        self.full_mask = (1 << len(self.labels)) - 1
+        # None stands for the single room of a deployment without a room column
+        self.rooms = list(rooms) or [None]
+
+    def bit(self, label):
+        index = self.positions.get(label)
+        return 0 if index is None else 1 << index
+
+    def mask(self, labels):
+        mask = 0
+        for label in labels:
+            mask |= self.bit(label)
+        return mask
+
+    def labels_in(self, mask):
+        """Labels of the set bits, earliest first."""
+        labels = []
+        while mask:
+            lowest = mask & -mask
+            labels.append(self.labels[lowest.bit_length() - 1])
+            mask ^= lowest
+        return labels
+
+    def mask_after(self, minutes):
+        """Slots starting strictly after ``minutes`` past midnight."""
+        mask = 0
+        for index, start in enumerate(self.starts):
+            if start > minutes:
+                mask |= 1 << index
+        return mask
+
+    def windows(self, free_mask, length):
+        """Start bits of every run of ``length`` consecutive free slots."""
+        starts = free_mask
+        for offset in range(1, length):
+            starts &= free_mask >> offset
+        return starts
+
+    # Slot keys carry the room for multi-room deployments: "10:00" or "10:00 Room"
+    @staticmethod
+    def slot_key(label, room):
+        return label if room is None else f"{label} {room}"
+
+    @staticmethod
+    def parse_key(key):
+        label, _, room = key.partition(" ")
+        return label, room or None
+
+
+class AvailabilityIndex:
+    """Reserved-slot bitmaps per (date, room)."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.reserved = defaultdict(int)
+        self.stale_since = None  # Fetch time when built from a fallback snapshot
+
+    @classmethod
+    def from_rows(cls, grid, rows):
+        index = cls(grid)
+        for row in rows:
+            index.add(row["date"], row["slot"], row.get("room"))
+        return index
+
+    def add(self, date, slot, room=None):
+        self.reserved[(date, room)] |= self.grid.bit(slot)
+
+    def remove(self, date, slot, room=None):
+        self.reserved[(date, room)] &= ~self.grid.bit(slot)
+
+    def free_masks(self, date, bookable, held=None):
+        """{room: free mask} given the bookable slots and per-room held masks."""
+        held = held or {}
+        return {
+            room: bookable & ~self.reserved.get((date, room), 0) & ~held.get(room, 0)
+            for room in self.grid.rooms
+        }
+
+    def free_keys(self, date, bookable, held=None):
+        """Free slot keys, ordered by time and then by room."""
+        free = self.free_masks(date, bookable, held)
+        union = 0
+        for mask in free.values():
+            union |= mask
+
+        keys = []
+        for label in self.grid.labels_in(union):
+            bit = self.grid.bit(label)
+            keys.extend(
+                self.grid.slot_key(label, room) for room in self.grid.rooms if free[room] & bit
+            )
+        return keys
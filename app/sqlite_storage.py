@@ -0,0 +1,159 @@
+import logging
+import sqlite3
+
+from app.storage import ReservationStore
+
+logger = logging.getLogger(__name__)
+
+# The unique booking index also serves (date, slot) lookups. IFNULL keeps
+# single-room rows (room NULL) unique, since SQLite treats NULLs as distinct.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    room TEXT,
+    user_id INTEGER NOT NULL,
+    username TEXT,
+    name TEXT,
+    surname TEXT,
+    phone TEXT,
+    payment_status TEXT,
+    payment_method TEXT,
+    payment_id TEXT,
+    created_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS reservations_booking
+    ON reservations (date, slot, IFNULL(room, ''));
+CREATE INDEX IF NOT EXISTS reservations_user_date ON reservations (user_id, date);
+"""
+
+COLUMNS = (
+    "date",
+    "slot",
+    "room",
+    "user_id",
+    "username",
+    "name",
+    "surname",
+    "phone",
+    "payment_status",
+    "payment_method",
+    "payment_id",
+    "created_at",
+)
+
+
+def strip_room(row):
+    # Match the Supabase rows of a single-room venue, which have no room column
+    if row.get("room") is None:
+        row.pop("room", None)
+    return row
+
+
+class SQLiteStore(ReservationStore):
+    """Reservations in a local SQLite file, for single-venue deployments.
+
+    Queries run inline on the event loop: with WAL and synchronous=NORMAL an
+    indexed lookup or a commit takes microseconds, less than a hop to a
+    worker thread would.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._connection.commit()
+
+    def _rows(self, sql, params=()):
+        return [strip_room(dict(row)) for row in self._connection.execute(sql, params)]
+
+    async def close(self):
+        self._connection.close()
+
+    async def get_reserved_rows(self, first_date, last_date, with_room):
+        columns = "id, date, slot, room" if with_room else "id, date, slot"
+        return self._rows(
+            f"SELECT {columns} FROM reservations WHERE date BETWEEN ? AND ?",
+            (first_date, last_date),
+        )
+
+    async def is_slot_taken(self, date, slot, room=None):
+        row = self._connection.execute(
+            "SELECT 1 FROM reservations WHERE date = ? AND slot = ? AND IFNULL(room, '') = ?",
+            (date, slot, room or ""),
+        ).fetchone()
+        return row is not None
+
+    async def insert_reservation(self, reservation):
+        columns = [column for column in COLUMNS if column in reservation]
+        with self._connection:
+            cursor = self._connection.execute(
+                f"INSERT INTO reservations ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [reservation[column] for column in columns],
+            )
+        return cursor.lastrowid
+
+    async def update_reservation(self, reservation_id, values):
+        columns = [column for column in COLUMNS if column in values]
+        with self._connection:
+            self._connection.execute(
+                f"UPDATE reservations SET {', '.join(f'{column} = ?' for column in columns)} "
+                "WHERE id = ?",
+                [values[column] for column in columns] + [reservation_id],
+            )
+
+    async def get_user_reservations(self, user_id, first_date, with_room=False):
+        columns = "id, slot, date, room, created_at" if with_room else "id, slot, date, created_at"
+        return self._rows(
+            f"SELECT {columns} FROM reservations WHERE user_id = ? AND date >= ? ORDER BY date",
+            (user_id, first_date),
+        )
+
+    async def get_user_reservations_page(self, user_id, after, before, limit, with_room=False):
+        columns = "slot, date, room, created_at" if with_room else "slot, date, created_at"
+        keys = ("date", "slot", "room") if with_room else ("date", "slot")
+        row_value = f"({', '.join(keys)})"
+        placeholders = f"({', '.join('?' for _ in keys)})"
+        sql = f"SELECT {columns} FROM reservations WHERE user_id = ?"
+        params = [user_id]
+        if before:
+            sql += f" AND {row_value} < {placeholders} ORDER BY "
+            sql += ", ".join(f"{key} DESC" for key in keys)
+            params.extend(before)
+        else:
+            if after:
+                sql += f" AND {row_value} > {placeholders}"
+                params.extend(after)
+            sql += f" ORDER BY {', '.join(keys)}"
+        return self._rows(sql + " LIMIT ?", params + [limit])
+
+    async def get_upcoming_reservations(self, first_date):
+        return self._rows(
+            "SELECT date, slot, user_id FROM reservations WHERE date >= ?", (first_date,)
+        )
+
+    async def get_reservations_page(self, first_date, last_date, cursor, limit):
+        sql = "SELECT * FROM reservations WHERE date BETWEEN ? AND ?"
+        params = [first_date, last_date]
+        if cursor:
+            sql += " AND (date, id) > (?, ?)"
+            params.extend(cursor)
+        return self._rows(sql + " ORDER BY date, id LIMIT ?", params + [limit])
+
+    async def delete_reservations(self, user_id, date=None, slot=None, room=None):
+        sql, params = "FROM reservations WHERE user_id = ?", [user_id]
+        if date is not None:
+            sql += " AND date = ? AND slot = ?"
+            params.extend((date, slot))
+        if room is not None:
+            sql += " AND room = ?"
+            params.append(room)
+        with self._connection:
+            rows = self._rows(f"SELECT * {sql}", params)
+            self._connection.execute(f"DELETE {sql}", params)
+        return rows
@@ -0,0 +1,31 @@
+import logging
+import time
+
+from app.handlers import week_dates
+
+logger = logging.getLogger(__name__)
+
+
+async def prewarm(db):
+    """Opens the Supabase connection and queries the week /select_date shows.
+
+    Runs before the bot takes updates, so the first user after a deploy does
+    not pay for the TLS handshake and the lazily built PostgREST session.
+    Failures are logged and startup carries on.
+    """
+    started = time.perf_counter()
+    dates = week_dates(db)
+    try:
+        week_slots = await db.get_available_slots_for_dates(dates)
+    except Exception as e:
+        logger.warning("Startup pre-warm failed: %s", e)
+        return None
+
+    logger.info(
+        "Pre-warmed availability for %s..%s in %.0f ms (%d free slots)",
+        dates[0],
+        dates[-1],
+        (time.perf_counter() - started) * 1000,
+        sum(len(slots) for slots in week_slots.values()),
+    )
+    return week_slots
@@ -0,0 +1,193 @@
+import os
+from abc import ABC, abstractmethod
+
+from app.config import Config
+from app.pools import supabase_realtime_client, supabase_rest_client
+from app.resilience import CircuitBreaker
+
+
+def keyset_condition(keys, cursor, op):
+    """PostgREST ``or`` filter for rows whose ``keys`` tuple is ``op`` ("gt"/"lt") the cursor.
+
+    Values are double-quoted, so room names may contain PostgREST's reserved
+    characters.
+    """
+    quoted = [f'"{value}"' for value in cursor]
+    terms = []
+    for index, key in enumerate(keys):
+        equal = [f"{keys[prior]}.eq.{quoted[prior]}" for prior in range(index)]
+        term = f"{key}.{op}.{quoted[index]}"
+        terms.append(f"and({','.join(equal + [term])})" if equal else term)
+    return ",".join(terms)
+
+
+class ReservationStore(ABC):
+    """Where reservations are kept.
+
+    Database owns the booking logic (drafts, caches, snapshots, listeners)
+    and goes through these methods for every read and write of the
+    reservations table. Rows are plain dicts with the table's column names;
+    ``room`` is only present when the venue has several rooms. A backend
+    that leaves any of the abstract methods out cannot be instantiated.
+    """
+
+    breaker = None  # CircuitBreaker guarding a remote backend, if any
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def get_reserved_rows(self, first_date, last_date, with_room):
+        """Returns id, date, slot (and room) of every reservation in a date range."""
+
+    @abstractmethod
+    async def is_slot_taken(self, date, slot, room=None):
+        """True if a reservation exists for the slot (in the room, with several rooms)."""
+
+    @abstractmethod
+    async def insert_reservation(self, reservation):
+        """Inserts a reservation; returns its id. Raises if the slot is already booked."""
+
+    @abstractmethod
+    async def update_reservation(self, reservation_id, values):
+        """Sets the given column values on one reservation."""
+
+    @abstractmethod
+    async def get_user_reservations(self, user_id, first_date, with_room=False):
+        """Returns id, slot, date (room) and created_at of a user's reservations from a date on."""
+
+    @abstractmethod
+    async def get_user_reservations_page(self, user_id, after, before, limit, with_room=False):
+        """Returns up to ``limit`` of a user's rows after or before a keyset cursor.
+
+        The cursor is (date, slot), or (date, slot, room) ``with_room``. Rows
+        come in query order: ascending after the cursor (or from the start),
+        descending before it.
+        """
+
+    @abstractmethod
+    async def get_upcoming_reservations(self, first_date):
+        """Returns date, slot and user_id of every reservation from a date on."""
+
+    @abstractmethod
+    async def get_reservations_page(self, first_date, last_date, cursor, limit):
+        """Returns up to ``limit`` full rows in a date range after a (date, id) cursor."""
+
+    @abstractmethod
+    async def delete_reservations(self, user_id, date=None, slot=None, room=None):
+        """Deletes a user's reservations, optionally one (date, slot, room); returns the deleted rows."""
+
+
+class SupabaseStore(ReservationStore):
+    """Reservations in the Supabase ``reservations`` table, over PostgREST.
+
+    Every call has a deadline and goes through a circuit breaker; reads are
+    hedged with a second request when the first is slow.
+    """
+
+    def __init__(self, url=None, key=None):
+        self.url = url or os.getenv("SUPABASE_URL")
+        self.key = key or os.getenv("SUPABASE_KEY")
+        self.client = supabase_rest_client(self.url, self.key)
+        self.breaker = CircuitBreaker(Config.DB_BREAKER_FAILURES, Config.DB_BREAKER_RESET)
+
+    async def _read(self, request):
+        """Executes an idempotent query under the read deadline, hedged once if it is slow."""
+        return await self.breaker.call(
+            request.execute, Config.DB_READ_TIMEOUT, hedge_after=Config.DB_HEDGE_AFTER or None
+        )
+
+    async def _write(self, request):
+        return await self.breaker.call(request.execute, Config.DB_WRITE_TIMEOUT)
+
+    def table(self):
+        return self.client.from_("reservations")
+
+    async def close(self):
+        """Close the underlying HTTP connections."""
+        await self.client.aclose()
+
+    def realtime_client(self):
+        return supabase_realtime_client(self.url, self.key)
+
+    async def get_reserved_rows(self, first_date, last_date, with_room):
+        columns = "id, date, slot, room" if with_room else "id, date, slot"
+        response = await self._read(
+            self.table().select(columns).gte("date", first_date).lte("date", last_date)
+        )
+        return response.data
+
+    async def is_slot_taken(self, date, slot, room=None):
+        request = self.table().select("id").eq("date", date).eq("slot", slot)
+        if room is not None:
+            request = request.eq("room", room)
+        response = await self._read(request.limit(1))
+        return bool(response.data)
+
+    async def insert_reservation(self, reservation):
+        response = await self._write(self.table().insert(reservation))
+        return response.data[0]["id"]
+
+    async def update_reservation(self, reservation_id, values):
+        await self._write(self.table().update(values).eq("id", reservation_id))
+
+    async def get_user_reservations(self, user_id, first_date, with_room=False):
+        columns = "id, slot, date, room, created_at" if with_room else "id, slot, date, created_at"
+        response = await self._read(
+            self.table()
+            .select(columns)
+            .filter("user_id", "eq", user_id)
+            .filter("date", "gte", first_date)
+            .order("date")
+        )
+        return response.data
+
+    async def get_user_reservations_page(self, user_id, after, before, limit, with_room=False):
+        columns = "slot, date, room, created_at" if with_room else "slot, date, created_at"
+        keys = ("date", "slot", "room") if with_room else ("date", "slot")
+        request = self.table().select(columns).filter("user_id", "eq", user_id)
+        if before:
+            request = request.or_(keyset_condition(keys, before, "lt"))
+            for key in keys:
+                request = request.order(key, desc=True)
+        else:
+            if after:
+                request = request.or_(keyset_condition(keys, after, "gt"))
+            for key in keys:
+                request = request.order(key)
+        response = await self._read(request.limit(limit))
+        return response.data
+
+    async def get_upcoming_reservations(self, first_date):
+        response = await self._read(
+            self.table().select("date, slot, user_id").gte("date", first_date)
+        )
+        return response.data
+
+    async def get_reservations_page(self, first_date, last_date, cursor, limit):
+        request = self.table().select("*").gte("date", first_date).lte("date", last_date)
+        if cursor:
+            date, row_id = cursor
+            request = request.or_(f"date.gt.{date},and(date.eq.{date},id.gt.{row_id})")
+        response = await self._read(request.order("date").order("id").limit(limit))
+        return response.data
+
+    async def delete_reservations(self, user_id, date=None, slot=None, room=None):
+        if date is None:
+            request = self.table().delete().eq("user_id", user_id)
+        else:
+            match = {"user_id": user_id, "date": date, "slot": slot}
+            if room is not None:
+                match["room"] = room
+            request = self.table().delete().match(match)
+        response = await self._write(request)
+        return response.data
+
+
+def create_store():
+    """Returns the ReservationStore selected by ``Config.STORAGE_BACKEND``."""
+    if Config.STORAGE_BACKEND == "sqlite":
+        from app.sqlite_storage import SQLiteStore
+
+        return SQLiteStore(Config.SQLITE_PATH)
+    return SupabaseStore()
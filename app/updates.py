@@ -0,0 +1,66 @@
+import asyncio
+
+from telegram.ext import BaseUpdateProcessor
+
+# Passed to BaseUpdateProcessor, whose semaphore must never be the one that waits
+UNBOUNDED_UPDATES = 2**31 - 1
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates from different users in parallel, one user's updates in order.
+
+    Each user has a FIFO lock that is taken before a concurrency slot, so a
+    user's queued updates wait their turn without holding slots others could
+    use. ``max_concurrent_updates`` caps how many handlers run at once.
+
+    BaseUpdateProcessor.process_update is final and takes its own semaphore
+    before do_process_update, which would hand out slots before the user
+    lock. So the base class gets a limit it never reaches, and the lock and
+    the real limit are both taken here.
+    """
+
+    def __init__(self, max_concurrent_updates):
+        super().__init__(UNBOUNDED_UPDATES)
+        self.limit = max_concurrent_updates
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self._locks = {}  # user id -> asyncio.Lock
+        self._queued = {}  # user id -> updates waiting or running
+        self.processed = 0
+        self.max_depth = 0
+
+    @staticmethod
+    def ordering_key(update):
+        # Updates without a user or chat (e.g. polls) share one queue
+        if getattr(update, "effective_user", None):
+            return update.effective_user.id
+        if getattr(update, "effective_chat", None):
+            return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update, coroutine):
+        key = self.ordering_key(update)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        depth = self._queued[key] = self._queued.get(key, 0) + 1
+        self.max_depth = max(self.max_depth, depth)
+        try:
+            async with lock, self._slots:
+                await coroutine
+        finally:
+            self.processed += 1
+            self._queued[key] -= 1
+            if not self._queued[key]:
+                del self._queued[key]
+                del self._locks[key]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def queue_depth(self):
+        """Updates accepted but not yet finished, across all users."""
+        return sum(self._queued.values())
+
+    def active_users(self):
+        return len(self._queued)
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import Application, ContextTypes
+
+from app.outbox import INTERACTIVE
+from app.resilience import is_backend_failure
+
+logger = logging.getLogger(__name__)
+
+CLAIM_WINDOW_SECONDS = 5 * 60  # How long a freed slot is held for the notified user
+
+
+class Waitlist:
+    """FIFO queues of users waiting for a booked (date, slot) to free up.
+
+    Cancellations reach the waitlist through the Database listener hooks. The
+    first user in line gets the freed slot held for them for the claim window
+    and a message with a button to book it; if they let the hold lapse, the
+    slot is offered to the next user.
+    """
+
+    def __init__(self, application: Application, db, outbox, claim_window=CLAIM_WINDOW_SECONDS):
+        self.application = application
+        self.db = db
+        self.outbox = outbox
+        self.claim_window = claim_window
+        self._queues = {}  # (date, slot) -> deque of (user_id, username)
+        self._tasks = set()
+        self.offers_sent = 0
+
+    def join(self, date, slot, user_id, username):
+        """Queue the user for a slot; returns their 1-based position."""
+        self._drop_past()
+        queue = self._queues.setdefault((date, slot), deque())
+        for position, (queued_user, _) in enumerate(queue, start=1):
+            if queued_user == user_id:
+                return position
+        queue.append((user_id, username))
+        return len(queue)
+
+    def leave(self, date, slot, user_id):
+        queue = self._queues.get((date, slot), ())
+        for entry in [entry for entry in queue if entry[0] == user_id]:
+            queue.remove(entry)  # In place: an offer in progress may hold this deque
+
+    def waiting(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _drop_past(self):
+        today = datetime.now(self.db.timezone).strftime("%Y-%m-%d")
+        for key in [key for key in self._queues if key[0] < today or not self._queues[key]]:
+            del self._queues[key]
+
+    # Database listener hooks
+    def reservation_added(self, date, slot, user_id):
+        self.leave(date, slot, user_id)  # Booked it some other way
+
+    def reservation_removed(self, date, slot, user_id):
+        if self._queues.get((date, slot)):
+            task = asyncio.create_task(self._offer(date, slot))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    # Offers
+    async def _offer(self, date, slot):
+        """Hold a free key for (date, slot) for the next user in line and tell them.
+
+        Runs as a background task, so failures are logged here; the queue is
+        left as it was.
+        """
+        try:
+            await self._offer_next(date, slot)
+        except Exception as e:
+            if is_backend_failure(e):
+                logger.warning(
+                    "Waitlist offer for %s %s skipped, store unavailable: %s", date, slot, e
+                )
+            else:
+                logger.exception("Waitlist offer for %s %s failed", date, slot)
+
+    async def _offer_next(self, date, slot):
+        queue = self._queues.get((date, slot))
+        if not queue:
+            return
+
+        free_keys = [
+            key
+            for key in await self.db.get_available_slots(date)
+            if self.db.grid.parse_key(key)[0] == slot
+        ]
+
+        # Holding a slot releases the user's other draft, so users in the middle
+        # of another booking keep their place and the offer goes to the next one
+        entry = next((entry for entry in queue if not self.db.has_draft(entry[0])), None)
+        if entry is None:
+            # Everyone waiting is busy; try again once the first of their drafts ends
+            waiting = {user_id for user_id, _ in queue}
+            expires_at = min(
+                draft["expires_at"]
+                for draft in self.db.drafts.values()
+                if draft["user_id"] in waiting
+            )
+            self.application.job_queue.run_once(
+                self._claim_expired,
+                when=max(expires_at - time.monotonic(), 0),
+                data=(date, slot, None),
+                name="waitlist_claim",
+            )
+            return
+        user_id, username = entry
+        while free_keys:
+            draft_id = await self.db.hold_slot(
+                date, free_keys[0], user_id, username, ttl=self.claim_window
+            )
+            if not draft_id:
+                free_keys.pop(0)
+                continue
+
+            if entry in queue:
+                queue.remove(entry)
+            self.offers_sent += 1
+            self.outbox.send_message(
+                user_id,
+                f"Звільнився слот {free_keys[0]} {date} 🎉 Він закріплений за вами на "
+                f"{self.claim_window // 60} хвилин — натисніть, щоб забронювати 👇",
+                priority=INTERACTIVE,
+                reply_markup=InlineKeyboardMarkup(
+                    [[InlineKeyboardButton("Забронювати ✅", callback_data=f"{date} {free_keys[0]}")]]
+                ),
+            )
+            self.application.job_queue.run_once(
+                self._claim_expired,
+                when=self.claim_window,
+                data=(date, slot, draft_id),
+                name="waitlist_claim",
+            )
+            return
+
+    async def _claim_expired(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        date, slot, draft_id = context.job.data
+        self.db.release_expired_drafts()
+        draft = self.db.drafts.get(draft_id)
+        if draft:
+            # The user picked the slot up and is still filling in their details
+            context.job_queue.run_once(
+                self._claim_expired,
+                when=max(draft["expires_at"] - time.monotonic(), 0),
+                data=context.job.data,
+                name="waitlist_claim",
+            )
+            return
+        # Either booked (then it is no longer free) or lapsed: offer it to the next user
+        await self._offer(date, slot)
+
+
+def setup_waitlist(application: Application, db, outbox) -> Waitlist:
+    waitlist = Waitlist(application, db, outbox)
+    db.add_listener(waitlist)
+    return waitlist
@@ -0,0 +1,83 @@
+import asyncio
+import hmac
+import logging
+import signal
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def build_webhook_app(application: Application, path: str, secret_token: str) -> web.Application:
+    """HTTP app that validates the secret token and queues each posted Update."""
+
+    async def handle_update(request: web.Request) -> web.Response:
+        received_token = request.headers.get(SECRET_TOKEN_HEADER, "")
+        if not hmac.compare_digest(received_token, secret_token):
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        await application.update_queue.put(Update.de_json(data, application.bot))
+        return web.Response()
+
+    webhook_app = web.Application()
+    webhook_app.router.add_post(f"/{path}", handle_update)
+    return webhook_app
+
+
+async def run_webhook(application: Application) -> None:
+    """Serve updates over a local HTTP server until SIGINT/SIGTERM.
+
+    Mirrors the lifecycle of Application.run_polling, including the
+    post_init/post_stop/post_shutdown hooks.
+    """
+    runner = web.AppRunner(
+        build_webhook_app(application, Config.WEBHOOK_PATH, Config.WEBHOOK_SECRET_TOKEN),
+        access_log=None,
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    try:
+        await runner.setup()
+        await web.TCPSite(runner, Config.WEBHOOK_LISTEN, Config.WEBHOOK_PORT).start()
+        logger.info(
+            "Serving webhook on %s:%s/%s",
+            Config.WEBHOOK_LISTEN,
+            Config.WEBHOOK_PORT,
+            Config.WEBHOOK_PATH,
+        )
+
+        if Config.WEBHOOK_URL:
+            await application.bot.set_webhook(
+                url=f"{Config.WEBHOOK_URL.rstrip('/')}/{Config.WEBHOOK_PATH}",
+                secret_token=Config.WEBHOOK_SECRET_TOKEN,
+                max_connections=Config.WEBHOOK_MAX_CONNECTIONS,
+                allowed_updates=Update.ALL_TYPES,
+            )
+
+        await application.start()
+        await stop.wait()
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+    finally:
+        await runner.cleanup()
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
@@ -0,0 +1,136 @@
+"""End-to-end booking-flow benchmark for ``Handlers``.
+
+Every simulated user walks the whole flow with synthetic updates:
+select_date -> handle_date_selection -> handle_slot_selection ->
+handle_user_details -> handle_payment_choice, against the in-process
+PostgREST stand-in. Reports per-handler latency percentiles and completed
+bookings per second for each concurrency level.
+
+    python -m benchmarks.booking_flow --concurrency 1 10 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from collections import defaultdict
+
+from benchmarks.fake_postgrest import FakePostgrest
+from benchmarks.telegram_stubs import FakeBot, UpdateFactory, make_context
+
+FAKE_KEY = "bench.fake.key"
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+
+    async def call(self, name, handler, update, context):
+        started = time.perf_counter()
+        await handler(update, context)
+        self.latencies[name].append(time.perf_counter() - started)
+
+
+async def book(handlers, updates, recorder, user_id):
+    context = make_context()
+    await recorder.call(
+        "select_date", handlers.select_date, updates.text_update(user_id, "/select_date"), context
+    )
+    week_slots = context.user_data.get("week_slots")
+    if not week_slots:
+        return
+
+    dates = list(week_slots)
+    date = dates[user_id % len(dates)]
+    await recorder.call(
+        "handle_date_selection",
+        handlers.handle_date_selection,
+        updates.callback_update(user_id, date),
+        context,
+    )
+
+    slots = week_slots[date]
+    if not slots:
+        return
+    slot = slots[user_id % len(slots)]
+    await recorder.call(
+        "handle_slot_selection",
+        handlers.handle_slot_selection,
+        updates.callback_update(user_id, f"{date} {slot}"),
+        context,
+    )
+    await recorder.call(
+        "handle_user_details",
+        handlers.handle_user_details,
+        updates.text_update(user_id, f"Name{user_id}, Surname, +380000000000"),
+        context,
+    )
+    await recorder.call(
+        "handle_payment_choice",
+        handlers.handle_payment_choice,
+        updates.callback_update(user_id, "payment:cafe"),
+        context,
+    )
+
+
+def percentile_row(name, samples):
+    cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+    p50, p95, p99 = (cuts[index] * 1000 for index in (49, 94, 98))
+    return f"  {name:<22} n={len(samples):<5} p50={p50:7.2f}ms p95={p95:7.2f}ms p99={p99:7.2f}ms"
+
+
+async def run_level(server, concurrency, telegram_latency):
+    from app.database import Database
+    from app.handlers import Handlers
+
+    server.tables.clear()
+    db = Database()
+    handlers = Handlers(db)
+    updates = UpdateFactory(FakeBot(latency=telegram_latency))
+    recorder = Recorder()
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(book(handlers, updates, recorder, user_id) for user_id in range(1, concurrency + 1))
+    )
+    elapsed = time.perf_counter() - started
+    await db.close()
+
+    bookings = len(server.tables["reservations"])
+    print(
+        f"concurrency={concurrency} bookings={bookings} "
+        f"elapsed={elapsed:.3f}s bookings/s={bookings / elapsed:.1f} "
+        f"db_requests={server.request_count}"
+    )
+    for name, samples in recorder.latencies.items():
+        print(percentile_row(name, samples))
+    server.request_count = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per DB request")
+    parser.add_argument(
+        "--telegram-latency", type=float, default=0.0, help="seconds per Bot API call"
+    )
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with FakePostgrest(latency=args.latency) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+        os.environ.setdefault("BOT_TOKEN", "123:bench")
+        os.environ["PERSISTENCE_PATH"] = ""
+
+        async def run_all():
+            for concurrency in args.concurrency:
+                await run_level(server, concurrency, args.telegram_latency)
+
+        asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Throughput of the async ``Database`` with N simulated concurrent users.
+
+Each simulated user looks up free slots for a date and then tries to book
+one, which is the database work behind one pass through the booking flow.
+The same workload is run once with users awaited one after another (what the
+event loop effectively did while the Supabase client was blocking) and once
+with all users in flight together.
+
+    python -m benchmarks.db_concurrency --users 1 10 50 100 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.fake_postgrest import FakePostgrest
+
+FAKE_KEY = "bench.fake.key"
+
+
+async def simulate_user(db, user_id, dates):
+    date = dates[user_id % len(dates)]
+    slots = await db.get_available_slots(date)
+    if slots:
+        draft_id = await db.hold_slot(date, slots[user_id % len(slots)], user_id, f"user{user_id}")
+        if draft_id:
+            await db.commit_draft(draft_id, "pending", None, "В кафе")
+
+
+async def run(db, users, dates, concurrent):
+    started = time.perf_counter()
+    if concurrent:
+        await asyncio.gather(*(simulate_user(db, user_id, dates) for user_id in range(users)))
+    else:
+        for user_id in range(users):
+            await simulate_user(db, user_id, dates)
+    return time.perf_counter() - started
+
+
+async def benchmark(server, user_counts):
+    from app.database import Database
+
+    tomorrow = datetime.now() + timedelta(days=1)
+    dates = [(tomorrow + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(6)]
+
+    print(f"{'users':>6} {'mode':>11} {'seconds':>9} {'users/s':>9}")
+    for users in user_counts:
+        for concurrent in (False, True):
+            server.tables.clear()
+            db = Database()
+            elapsed = await run(db, users, dates, concurrent)
+            await db.close()
+            mode = "concurrent" if concurrent else "sequential"
+            print(f"{users:>6} {mode:>11} {elapsed:>9.3f} {users / elapsed:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request")
+    args = parser.parse_args()
+
+    with FakePostgrest(latency=args.latency) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+        os.environ.setdefault("BOT_TOKEN", "123:bench")
+        asyncio.run(benchmark(server, args.users))
+
+
+if __name__ == "__main__":
+    main()
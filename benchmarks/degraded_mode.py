@@ -0,0 +1,88 @@
+"""Availability reads against a slow, then failing, Supabase.
+
+Phase 1 makes a fraction of requests very slow and compares read latency
+percentiles with hedging off and on. Phase 2 switches the PostgREST
+stand-in to a 503 outage and shows the circuit breaker tripping while
+reads are answered from the last-known-good snapshot, then recovering.
+
+    python -m benchmarks.degraded_mode --reads 200 --slow-fraction 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.fake_postgrest import FakePostgrest
+
+FAKE_KEY = "bench.fake.key"
+
+
+def percentiles(samples):
+    cuts = sorted(samples)
+    return " ".join(
+        f"p{p}={cuts[min(len(cuts) - 1, len(cuts) * p // 100)] * 1000:7.1f}ms" for p in (50, 95, 99)
+    )
+
+
+async def timed_reads(db, date, reads):
+    samples = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        await db.get_available_slots(date)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def benchmark(server, args):
+    from app.config import Config
+    from app.database import Database
+    from app.resilience import is_stale
+
+    db = Database()
+    date = (datetime.now(db.timezone) + timedelta(days=1)).strftime("%Y-%m-%d")
+    await db.commit_draft(await db.hold_slot(date, "12:00", 1, "user1"), "pending", None, "В кафе")
+
+    server.slow_fraction, server.slow_latency = args.slow_fraction, args.slow_latency
+    hedge_after = Config.DB_HEDGE_AFTER
+    Config.DB_HEDGE_AFTER = 0
+    print(f"no hedging    : {percentiles(await timed_reads(db, date, args.reads))}")
+    Config.DB_HEDGE_AFTER = hedge_after
+    print(f"hedged at {hedge_after * 1000:.0f}ms: {percentiles(await timed_reads(db, date, args.reads))}")
+    print(f"  hedges sent : {db.store.breaker.hedges}")
+    server.slow_fraction = 0
+
+    server.outage = True
+    stale = 0
+    for _ in range(20):
+        stale += is_stale(await db.get_available_slots(date))
+    print(f"outage        : {stale}/20 reads served stale, breaker {db.store.breaker.stats()}")
+
+    server.outage = False
+    db.store.breaker.opened_at -= db.store.breaker.reset_timeout  # Skip the wait before the probe
+    fresh = not is_stale(await db.get_available_slots(date))
+    print(f"recovered     : fresh={fresh}, breaker {db.store.breaker.stats()['state']}")
+    await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds per DB request")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with FakePostgrest(latency=args.latency) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+        os.environ.setdefault("BOT_TOKEN", "123:bench")
+        os.environ.setdefault("DB_HEDGE_AFTER", "0.1")
+        asyncio.run(benchmark(server, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""A small in-process stand-in for the Supabase REST (PostgREST) API.
+
+Only the subset of PostgREST used by ``app.database`` is implemented:
+column filters (``eq``, ``neq``, ``gt``, ``gte``, ``lt``, ``lte``, ``in``),
+``or``/``and`` groups, ``select``, ``order``, ``limit`` and ``offset``.
+Every request can be delayed by a fixed latency to mimic a network hop.
+For degraded-mode runs, a fraction of requests can be made much slower
+(``slow_fraction``/``slow_latency``), and ``outage`` answers everything with
+a 503 the way PostgREST does when it loses its database.
+"""
+
+import asyncio
+import random
+import threading
+from collections import defaultdict
+
+from aiohttp import web
+
+UNIQUE_KEYS = {"reservations": ("date", "slot", "room")}
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+
+
+def _coerce(value, arg):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return value, float(arg)
+        except ValueError:
+            pass
+    return ("" if value is None else str(value)), arg
+
+
+def _compare(value, op, arg):
+    if op == "in":
+        items = [item.strip('"') for item in arg.strip("()").split(",")]
+        return any(_compare(value, "eq", item) for item in items)
+    if op == "is":
+        return value is None if arg == "null" else str(value).lower() == arg
+    if len(arg) > 1 and arg[0] == arg[-1] == '"':
+        arg = arg[1:-1]  # Quoted values in or/and filters
+    left, right = _coerce(value, arg)
+    return {
+        "eq": left == right,
+        "neq": left != right,
+        "gt": left > right,
+        "gte": left >= right,
+        "lt": left < right,
+        "lte": left <= right,
+    }[op]
+
+
+def _split_top_level(expression):
+    parts, depth, current = [], 0, ""
+    for char in expression:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _parse_condition(expression):
+    """Turn ``col.op.arg`` / ``and(...)`` / ``or(...)`` into a predicate."""
+    for group, combine in (("and(", all), ("or(", any)):
+        if expression.startswith(group):
+            inner = [
+                _parse_condition(part)
+                for part in _split_top_level(expression[len(group) : -1])
+            ]
+            return lambda row: combine(predicate(row) for predicate in inner)
+    column, op, arg = expression.split(".", 2)
+    return lambda row: _compare(row.get(column), op, arg)
+
+
+def _parse_filters(query):
+    predicates = []
+    for key, value in query.items():
+        if key in RESERVED_PARAMS:
+            continue
+        if key in ("or", "and"):
+            predicates.append(_parse_condition(f"{key}{value}"))
+            continue
+        op, arg = value.split(".", 1)
+        predicates.append(_parse_condition(f"{key}.{op}.{arg}"))
+    return lambda row: all(predicate(row) for predicate in predicates)
+
+
+def _sort(rows, order):
+    for term in reversed(order.split(",")):
+        column, *modifiers = term.split(".")
+        rows.sort(
+            key=lambda row: (row.get(column) is None, row.get(column) or ""),
+            reverse="desc" in modifiers,
+        )
+    return rows
+
+
+def _project(rows, select):
+    if not select or select == "*":
+        return [dict(row) for row in rows]
+    columns = [column.strip() for column in select.split(",")]
+    return [{column: row.get(column) for column in columns} for row in rows]
+
+
+def _error(status, code, message):
+    body = {"code": code, "message": message, "details": None, "hint": None}
+    return web.json_response(body, status=status)
+
+
+class FakePostgrest:
+    """PostgREST stand-in serving an in-memory table store over HTTP."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.slow_fraction = 0.0
+        self.slow_latency = 0.0
+        self.outage = False
+        self.tables = defaultdict(list)
+        self.request_count = 0
+        self.change_listeners = []  # Called from the server thread with Realtime-shaped payloads
+        self._next_id = defaultdict(lambda: 1)
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self.url = None
+
+    def _emit(self, table, change, record=None, old_record=None):
+        payload = {
+            "data": {
+                "type": change,
+                "table": table,
+                "record": record,
+                "old_record": old_record,
+            }
+        }
+        for listener in self.change_listeners:
+            listener(payload)
+
+    # Request handling
+    async def _handle(self, request):
+        self.request_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.slow_fraction and random.random() < self.slow_fraction:
+            await asyncio.sleep(self.slow_latency)
+        if self.outage:
+            return _error(503, "PGRST002", "Could not query the database for the schema cache")
+
+        table = request.match_info["table"]
+        query = request.query
+        matches = _parse_filters(query)
+        rows = self.tables[table]
+
+        if request.method == "GET":
+            selected = _sort([row for row in rows if matches(row)], query.get("order", ""))
+            offset = int(query.get("offset", 0))
+            if "limit" in query:
+                selected = selected[offset : offset + int(query["limit"])]
+            else:
+                selected = selected[offset:]
+            return web.json_response(_project(selected, query.get("select")))
+
+        if request.method == "POST":
+            payload = await request.json()
+            payload = payload if isinstance(payload, list) else [payload]
+            inserted = []
+            for values in payload:
+                row = dict(values)
+                if self._violates_unique(table, row):
+                    return _error(409, "23505", "duplicate key value violates unique constraint")
+                row.setdefault("id", self._next_id[table])
+                self._next_id[table] = max(self._next_id[table], row["id"]) + 1
+                rows.append(row)
+                inserted.append(row)
+                self._emit(table, "INSERT", record=dict(row))
+            return web.json_response(_project(inserted, query.get("select")), status=201)
+
+        if request.method == "PATCH":
+            values = await request.json()
+            updated = [row for row in rows if matches(row)]
+            for row in updated:
+                old_record = dict(row)
+                row.update(values)
+                self._emit(table, "UPDATE", record=dict(row), old_record=old_record)
+            return web.json_response(_project(updated, query.get("select")))
+
+        if request.method == "DELETE":
+            deleted = [row for row in rows if matches(row)]
+            self.tables[table] = [row for row in rows if not matches(row)]
+            for row in deleted:
+                self._emit(table, "DELETE", old_record={"id": row["id"]})
+            return web.json_response(_project(deleted, query.get("select")))
+
+        return _error(405, "PGRST000", f"Unsupported method {request.method}")
+
+    def _violates_unique(self, table, row):
+        key = UNIQUE_KEYS.get(table)
+        if not key:
+            return False
+        values = tuple(row.get(column) for column in key)
+        return any(tuple(other.get(column) for column in key) == values for other in self.tables[table])
+
+    # Lifecycle
+    def _build_app(self):
+        app = web.Application()
+        app.router.add_route("*", "/rest/v1/{table}", self._handle)
+        return app
+
+    def start(self):
+        """Serve on an ephemeral local port from a background thread."""
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(self._build_app(), access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            self._loop.run_until_complete(site.start())
+            port = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://127.0.0.1:{port}"
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.url
+
+    async def _shutdown(self):
+        await self._runner.cleanup()
+        # Keep-alive connections can leave request handlers waiting after cleanup
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        future.result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
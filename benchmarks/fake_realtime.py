@@ -0,0 +1,43 @@
+"""A local stand-in for the Supabase Realtime feed of ``FakePostgrest`` writes."""
+
+import asyncio
+
+
+class FakeChangeFeed:
+    """Delivers FakePostgrest writes to a mirror, with controllable disconnects.
+
+    Events written while the feed is dropped are lost, as they would be on a
+    real connection drop; ``reconnect`` re-subscribes, which makes the mirror
+    resync.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.connected = False
+        self.mirror = None
+        self._stopped = None
+
+    async def run(self, mirror):
+        loop = asyncio.get_running_loop()
+        self.mirror = mirror
+        self._stopped = loop.create_future()
+        self.server.change_listeners.append(
+            lambda payload: loop.call_soon_threadsafe(self._deliver, payload)
+        )
+        self.reconnect()
+        await self._stopped
+
+    def _deliver(self, payload):
+        if self.connected:
+            self.mirror.on_change(payload)
+
+    def drop(self):
+        self.connected = False
+        self.mirror.on_disconnected()
+
+    def reconnect(self):
+        self.connected = True
+        self.mirror.on_subscribed()
+
+    def stop(self):
+        self._stopped.set_result(None)
@@ -0,0 +1,108 @@
+"""Availability lookups with and without the in-process reservation mirror.
+
+Runs the same select_date-style week lookups against the PostgREST stand-in
+directly and through a ReservationMirror fed by a local fake change feed,
+then checks the mirror still matches the database after a dropped feed and
+a reconnect.
+
+    python -m benchmarks.mirror_availability --lookups 200 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.fake_postgrest import FakePostgrest
+from benchmarks.fake_realtime import FakeChangeFeed
+
+FAKE_KEY = "bench.fake.key"
+
+
+async def time_lookups(db, dates, lookups):
+    started = time.perf_counter()
+    for _ in range(lookups):
+        await db.get_available_slots_for_dates(dates)
+    return (time.perf_counter() - started) / lookups
+
+
+async def direct_view(db, dates):
+    mirror, db.mirror = db.mirror, None
+    try:
+        return await db.get_available_slots_for_dates(dates)
+    finally:
+        db.mirror = mirror
+
+
+async def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("mirror did not settle")
+        await asyncio.sleep(0.01)
+
+
+async def benchmark(server, lookups):
+    from app.database import Database
+    from app.mirror import ReservationMirror
+
+    db = Database()
+    today = datetime.now(db.timezone)
+    dates = [(today + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(7)]
+    for user_id, date in enumerate(dates[1:], start=1):
+        draft_id = await db.hold_slot(date, "12:00", user_id, f"user{user_id}")
+        await db.commit_draft(draft_id, "pending", None, "В кафе")
+
+    direct = await time_lookups(db, dates, lookups)
+    expected = await db.get_available_slots_for_dates(dates)
+
+    feed = FakeChangeFeed(server)
+    db.mirror = ReservationMirror(db)
+    feed_task = asyncio.create_task(feed.run(db.mirror))
+    await wait_until(lambda: db.mirror.synced)
+
+    mirrored = await time_lookups(db, dates, lookups)
+    assert await db.get_available_slots_for_dates(dates) == expected
+
+    # Writes by another instance while the feed is down are missed until the reconnect resyncs
+    feed.drop()
+    await db.store.insert_reservation(
+        {"date": dates[2], "slot": "15:00", "user_id": 99, "username": "offline"}
+    )
+    feed.reconnect()
+    await wait_until(lambda: db.mirror.synced)
+    assert await db.get_available_slots_for_dates(dates) == await direct_view(db, dates)
+
+    # Live events keep it current without another resync
+    applied = db.mirror.events_applied
+    await db.cancel_slot(1, dates[1], "12:00")
+    await wait_until(lambda: db.mirror.events_applied > applied)
+    assert await db.get_available_slots_for_dates(dates) == await direct_view(db, dates)
+
+    print(f"direct query : {direct * 1000:8.3f} ms/lookup")
+    print(f"mirror       : {mirrored * 1000:8.3f} ms/lookup")
+    print(f"mirror stats : {db.mirror.stats()}")
+
+    feed.stop()
+    await feed_task
+    await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per DB request")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with FakePostgrest(latency=args.latency) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+        os.environ.setdefault("BOT_TOKEN", "123:bench")
+        asyncio.run(benchmark(server, args.lookups))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""CPU cost of rendering pickers and reservation lists, before and after caching.
+
+Compares the per-request keyboard building and row-by-row Markdown
+concatenation the handlers used to do against ``app.rendering``: cached
+keyboards and one-pass reservation lists split at Telegram's message
+limit. No network is involved; the numbers are pure CPU per request.
+
+    python -m benchmarks.rendering --sizes 10 100 1000 --repeat 200
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+os.environ.setdefault("BOT_TOKEN", "123:bench")
+
+from app.rendering import KeyboardCache, render_reservations  # noqa: E402
+
+HEADER = "Історія ваших бронювань:\n\n"
+
+
+def legacy_format_reservations(header, reservations):
+    message = header
+    for reservation in reservations:
+        try:
+            created_at = datetime.fromisoformat(reservation["created_at"]).strftime(
+                "%d.%m.%Y %H:%M"
+            )
+        except ValueError:
+            created_at = "Невідомий час"
+        message += (
+            f"📅 Дата: *{reservation['date']}*\n"
+            f"⏰ Час: *{reservation['slot']}*\n"
+            f"📝 Заброньовано: {created_at}\n"
+            f"-----------------------\n"
+        )
+    return message
+
+
+def legacy_slot_picker(date, slots):
+    return InlineKeyboardMarkup(
+        [[InlineKeyboardButton(slot, callback_data=f"{date} {slot}")] for slot in slots]
+    )
+
+
+def legacy_cancel_picker(reservations):
+    return InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(
+                    f"📅 {reservation['date']} ⏰ {reservation['slot']}",
+                    callback_data=f"cancel:{reservation['date']}:{reservation['slot']}",
+                )
+            ]
+            for reservation in reservations
+        ]
+    )
+
+
+def make_reservations(count):
+    first = datetime(2026, 1, 1, 10)
+    return [
+        {
+            "date": (first + timedelta(days=index // 12)).strftime("%Y-%m-%d"),
+            "slot": f"{10 + index % 12:02d}:00",
+            "created_at": (first + timedelta(minutes=index)).isoformat() + "+00:00",
+        }
+        for index in range(count)
+    ]
+
+
+def per_call_us(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def report(name, before, after):
+    print(f"  {name:<24} before={before:9.1f} us  after={after:9.1f} us  saved={before - after:9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    keyboards = KeyboardCache()
+    slots = [f"{hour:02d}:00" for hour in range(10, 22)]
+    print("pickers")
+    report(
+        "slot picker (12 slots)",
+        per_call_us(lambda: legacy_slot_picker("2026-01-01", slots), args.repeat),
+        per_call_us(lambda: keyboards.slot_picker("2026-01-01", slots), args.repeat),
+    )
+    mine = make_reservations(5)
+    report(
+        "cancel picker (5)",
+        per_call_us(lambda: legacy_cancel_picker(mine), args.repeat),
+        per_call_us(lambda: keyboards.cancel_picker(mine), args.repeat),
+    )
+
+    for size in args.sizes:
+        reservations = make_reservations(size)
+        messages = render_reservations(HEADER, reservations)
+        print(f"reservation list of {size} ({len(messages)} message(s))")
+        report(
+            "render",
+            per_call_us(lambda: legacy_format_reservations(HEADER, reservations), args.repeat),
+            per_call_us(lambda: render_reservations(HEADER, reservations), args.repeat),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start cost: import time per package, and the first request with and without pre-warm.
+
+Imports ``main`` in a fresh interpreter under ``python -X importtime`` and
+totals the self time of every module by top-level package. Then, against
+the PostgREST stand-in, times the first /select_date-style availability
+query of a fresh Database with and without ``app.startup.prewarm`` run
+first.
+
+    python -m benchmarks.startup --top 12 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks.fake_postgrest import FakePostgrest
+
+FAKE_KEY = "bench.fake.key"
+
+
+def import_times(env):
+    """Returns ({top-level package: self seconds}, total seconds) for ``import main``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|")
+        packages[module.strip().split(".")[0]] += int(self_us) / 1e6
+    return packages, sum(packages.values())
+
+
+async def first_request(warm):
+    from app.database import Database
+    from app.startup import prewarm
+
+    db = Database()
+    today = datetime.now(db.timezone)
+    dates = [(today + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(7)]
+    if warm:
+        await prewarm(db)
+    started = time.perf_counter()
+    await db.get_available_slots_for_dates(dates)
+    elapsed = time.perf_counter() - started
+    await db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=12, help="packages to list")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per DB request")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with FakePostgrest(latency=args.latency) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+        os.environ.setdefault("BOT_TOKEN", "123:bench")
+
+        packages, total = import_times(dict(os.environ))
+        print(f"import main: {total * 1000:.0f} ms")
+        for package, seconds in packages.most_common(args.top):
+            print(f"  {package:<20} {seconds * 1000:8.1f} ms")
+
+        cold = asyncio.run(first_request(warm=False))
+        warm = asyncio.run(first_request(warm=True))
+        print(f"first availability query, cold     : {cold * 1000:8.1f} ms")
+        print(f"first availability query, prewarmed: {warm * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
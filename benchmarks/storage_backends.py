@@ -0,0 +1,98 @@
+"""The same booking workload against the Supabase and SQLite storage backends.
+
+Each simulated user looks up the week's availability, books a slot through
+a draft, lists their reservations and pages their history; then everyone
+cancels. Supabase runs against the PostgREST stand-in with a network
+latency; SQLite runs on a temporary file with no network at all. The two
+backends must end up with the same answers.
+
+    python -m benchmarks.storage_backends --users 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from benchmarks.fake_postgrest import FakePostgrest
+
+FAKE_KEY = "bench.fake.key"
+
+
+async def timed(samples, name, awaitable):
+    started = time.perf_counter()
+    result = await awaitable
+    samples[name].append(time.perf_counter() - started)
+    return result
+
+
+async def workload(db, users):
+    samples = defaultdict(list)
+    today = datetime.now(db.timezone)
+    dates = [(today + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(1, 8)]
+    answers = []
+
+    for user_id in range(1, users + 1):
+        week = await timed(samples, "week availability", db.get_available_slots_for_dates(dates))
+        date = dates[user_id % len(dates)]
+        slot = week[date][user_id % len(week[date])]
+        draft_id = await timed(samples, "hold slot", db.hold_slot(date, slot, user_id, f"u{user_id}"))
+        db.update_draft_details(draft_id, "Name", "Surname", "+380000000000")
+        await timed(samples, "commit booking", db.commit_draft(draft_id, "pending", None, "cafe"))
+        current = await timed(samples, "current reservations", db.get_user_current_reservations(user_id))
+        page = await timed(samples, "history page", db.get_user_reservations_page(user_id))
+        answers.append((date, slot, [row["slot"] for row in current], len(page[0])))
+
+    for user_id in range(1, users + 1):
+        await timed(samples, "cancel all", db.cancel_reservations(user_id))
+    answers.append(await db.get_available_slots_for_dates(dates))
+    return samples, answers
+
+
+def report(name, samples):
+    print(name)
+    for operation, values in samples.items():
+        print(f"  {operation:<22} mean={statistics.mean(values) * 1000:8.3f} ms")
+
+
+async def run_backend(store_factory, users):
+    from app.database import Database
+
+    db = Database(store_factory())
+    try:
+        return await workload(db, users)
+    finally:
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per Supabase request")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    os.environ.setdefault("BOT_TOKEN", "123:bench")
+
+    with FakePostgrest(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+        from app.sqlite_storage import SQLiteStore
+        from app.storage import SupabaseStore
+
+        supabase_samples, supabase_answers = asyncio.run(run_backend(SupabaseStore, args.users))
+        sqlite_samples, sqlite_answers = asyncio.run(
+            run_backend(lambda: SQLiteStore(os.path.join(tmp, "reservations.sqlite3")), args.users)
+        )
+
+    report(f"supabase (PostgREST stand-in, {args.latency * 1000:.0f} ms/request)", supabase_samples)
+    report("sqlite (local file)", sqlite_samples)
+    print(f"same answers: {supabase_answers == sqlite_answers}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Synthetic Telegram updates and a bot stand-in for driving Handlers offline."""
+
+import asyncio
+import itertools
+import time
+from types import SimpleNamespace
+
+from telegram import Update
+
+
+class FakeBot:
+    """Records outgoing API calls instead of sending them.
+
+    Only the methods the handlers reach through ``reply_text``,
+    ``edit_message_text`` and ``CallbackQuery.answer`` are provided.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = []
+
+    async def _call(self, method, kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.calls.append((method, kwargs))
+        return True
+
+    async def send_message(self, **kwargs):
+        return await self._call("send_message", kwargs)
+
+    async def edit_message_text(self, **kwargs):
+        return await self._call("edit_message_text", kwargs)
+
+    async def answer_callback_query(self, **kwargs):
+        return await self._call("answer_callback_query", kwargs)
+
+
+class UpdateFactory:
+    """Builds message and callback-query updates as Telegram would deliver them."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    @staticmethod
+    def user(user_id):
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"}
+
+    def message(self, user_id, text):
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self.user(user_id),
+            "text": text,
+        }
+
+    def text_update(self, user_id, text):
+        data = {"update_id": next(self._update_ids), "message": self.message(user_id, text)}
+        return Update.de_json(data, self.bot)
+
+    def callback_update(self, user_id, callback_data):
+        data = {
+            "update_id": next(self._update_ids),
+            "callback_query": {
+                "id": str(next(self._update_ids)),
+                "from": self.user(user_id),
+                "chat_instance": str(user_id),
+                "data": callback_data,
+                "message": self.message(user_id, "keyboard"),
+            },
+        }
+        return Update.de_json(data, self.bot)
+
+
+def make_context():
+    """The handlers only touch ``context.user_data``."""
+    return SimpleNamespace(user_data={})
@@ -1,3 +1,5 @@
+import asyncio
+
 from telegram.ext import (
     Application,
     CallbackQueryHandler,
@@ -6,31 +8,102 @@ from telegram.ext import (
     filters,
 )
 
-from app.config import Config
+from app.config import Config, validate_config
 from app.database import Database
 from app.handlers import Handlers
+from app.idempotency import CallbackDeduplicator
+from app.metrics import Metrics
+from app.mirror import RealtimeChangeFeed, ReservationMirror
+from app.outbox import MessageQueue, ReplyRateLimiter
+from app.pools import PoolStats, telegram_request
 from app.scheduler import setup_scheduler
+from app.startup import prewarm
+from app.updates import PerUserUpdateProcessor
+from app.waitlist import setup_waitlist
 
 
 # Main function
 def main():
+    validate_config()
     db = Database()
-    app = Application.builder().token(Config.BOT_TOKEN).build()
-    handlers = Handlers(db)
+    metrics = Metrics() if Config.METRICS_PORT else None
+    metrics_runner = None
+    mirror_task = None
+    if Config.MIRROR_ENABLED and Config.STORAGE_BACKEND == "supabase":
+        db.mirror = ReservationMirror(db)
+
+    async def start_background(application: Application) -> None:
+        nonlocal metrics_runner, mirror_task
+        if metrics:
+            metrics_runner = await metrics.serve(Config.METRICS_HOST, Config.METRICS_PORT)
+        if db.mirror:
+            mirror_task = asyncio.create_task(
+                RealtimeChangeFeed(db.store.realtime_client()).run(db.mirror)
+            )
+        if Config.PREWARM:
+            await prewarm(db)
+
+    async def stop_outbox(application: Application) -> None:
+        await outbox.stop()
 
+    async def shutdown(application: Application) -> None:
+        if mirror_task:
+            mirror_task.cancel()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        await db.close()
+
+    update_processor = PerUserUpdateProcessor(Config.CONCURRENT_UPDATES)
+    telegram_pool = PoolStats("telegram", Config.HTTP_POOL_SIZE)
+    rate_limiter = ReplyRateLimiter()
+
+    builder = (
+        Application.builder()
+        .token(Config.BOT_TOKEN)
+        .request(telegram_request(telegram_pool))
+        .concurrent_updates(update_processor)
+        .rate_limiter(rate_limiter)
+        .post_stop(stop_outbox)
+        .post_shutdown(shutdown)
+    )
+    if metrics or db.mirror or Config.PREWARM:
+        builder = builder.post_init(start_background)
+    if Config.PERSISTENCE_PATH:
+        from app.persistence import SQLitePersistence
+
+        builder = builder.persistence(
+            SQLitePersistence(
+                Config.PERSISTENCE_PATH, update_interval=Config.PERSISTENCE_FLUSH_INTERVAL
+            )
+        )
+    app = builder.build()
+    outbox = MessageQueue(app.bot)
+    rate_limiter.queue = outbox  # Handler replies share the outbox's rate limits
+    waitlist = setup_waitlist(app, db, outbox)
+    handlers = Handlers(db, waitlist)
+    dedup = CallbackDeduplicator()  # Repeated taps on booking buttons never reach the DB twice
+
+    app.add_error_handler(handlers.handle_error)
     app.add_handler(CommandHandler("start", handlers.start))
 
     app.add_handler(CommandHandler("select_date", handlers.select_date))
     app.add_handler(CallbackQueryHandler(handlers.handle_date_selection, pattern=r"^\d{4}-\d{2}-\d{2}$"))
 
     app.add_handler(CommandHandler("reserve", handlers.reserve))
-    app.add_handler(CallbackQueryHandler(handlers.handle_slot_selection, pattern=r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}$"))
+    app.add_handler(CallbackQueryHandler(dedup.wrap(handlers.handle_slot_selection), pattern=r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}( .+)?$"))
+
+    app.add_handler(
+        CallbackQueryHandler(
+            handlers.handle_waitlist_join,
+            pattern=r"^waitlist:\d{4}-\d{2}-\d{2}:\d{2}:\d{2}$",
+        )
+    )
 
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handlers.handle_user_details))
 
     app.add_handler(
         CallbackQueryHandler(
-            handlers.handle_payment_choice, pattern=r"^payment:(online|cafe)$"
+            dedup.wrap(handlers.handle_payment_choice), pattern=r"^payment:(online|cafe)$"
         )
     )
 
@@ -44,18 +117,68 @@ def main():
             "view_my_all_reservations", handlers.view_user_all_reservations
         )
     )
+    app.add_handler(
+        CallbackQueryHandler(
+            handlers.handle_history_page,
+            pattern=r"^history:(next|prev):\d{4}-\d{2}-\d{2}:.+$",
+        )
+    )
 
     app.add_handler(CommandHandler("cancel_reservation", handlers.cancel_reservation))
     app.add_handler(
         CallbackQueryHandler(
-            handlers.handle_cancel_reservation, pattern=r"^cancel:.+:.+$"
+            dedup.wrap(handlers.handle_cancel_reservation), pattern=r"^cancel:.+:.+$"
         )
     )
     app.add_handler(CommandHandler("cancel_all_reservations", handlers.cancel))
 
-    setup_scheduler(app, db)
+    app.add_handler(CommandHandler("export", handlers.export_reservations))
+
+    setup_scheduler(app, db, outbox)
+
+    if metrics:
+        metrics.instrument_handlers(app)
+        metrics.instrument_database(db)
+        metrics.add_gauge("bot_reservation_cache_hits", lambda: db.reservation_cache.hits)
+        metrics.add_gauge("bot_reservation_cache_misses", lambda: db.reservation_cache.misses)
+        metrics.add_gauge("bot_outbox_pending", outbox.pending)
+        metrics.add_gauge("bot_update_queue_depth", update_processor.queue_depth)
+        metrics.add_gauge("bot_update_queue_max_depth", lambda: update_processor.max_depth)
+        metrics.add_gauge("bot_update_active_users", update_processor.active_users)
+        breaker = db.store.breaker
+        if breaker:
+            metrics.add_gauge("bot_db_breaker_state", lambda: breaker.state)
+            metrics.add_gauge("bot_db_breaker_trips", lambda: breaker.trips)
+            metrics.add_gauge("bot_db_breaker_rejected", lambda: breaker.rejected)
+            metrics.add_gauge("bot_db_hedged_reads", lambda: breaker.hedges)
+        metrics.add_gauge("bot_duplicate_callbacks", lambda: dedup.duplicates)
+        metrics.add_gauge("bot_keyboard_cache_hits", lambda: handlers.keyboards.keyboards.hits)
+        metrics.add_gauge("bot_keyboard_cache_misses", lambda: handlers.keyboards.keyboards.misses)
+        metrics.add_gauge("bot_waitlist_waiting", waitlist.waiting)
+        metrics.add_gauge("bot_waitlist_offers_sent", lambda: waitlist.offers_sent)
+        pools = [telegram_pool]
+        if Config.STORAGE_BACKEND == "supabase":
+            pools.append(db.store.client.pool_stats)
+        for pool in pools:
+            metrics.add_gauge(f"bot_http_{pool.name}_requests", lambda pool=pool: pool.requests)
+            metrics.add_gauge(f"bot_http_{pool.name}_in_flight", lambda pool=pool: pool.in_flight)
+            metrics.add_gauge(
+                f"bot_http_{pool.name}_peak_in_flight", lambda pool=pool: pool.peak_in_flight
+            )
+            metrics.add_gauge(
+                f"bot_http_{pool.name}_connections_opened",
+                lambda pool=pool: pool.connections_opened,
+            )
+        if db.mirror:
+            metrics.add_gauge("bot_mirror_synced", lambda: int(db.mirror.synced))
+            metrics.add_gauge("bot_mirror_resyncs", lambda: db.mirror.resyncs)
+
+    if Config.WEBHOOK_ENABLED:
+        from app.webhook import run_webhook  # aiohttp is only imported in webhook mode
 
-    app.run_polling()
+        asyncio.run(run_webhook(app))
+    else:
+        app.run_polling()
 
 
 if __name__ == "__main__":